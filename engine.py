@@ -5,10 +5,20 @@
 
 import pygame
 import os
+from dataclasses import dataclass
 from typing import Optional, Tuple, List, Dict
 from story import Story, Scene, Character, Choice, DialogLine
 
 
+@dataclass
+class GameLaunchConfig:
+    """Параметры запуска игры."""
+    width: int = 1280
+    height: int = 720
+    title: str = "Visual Novel"
+    save_dir: str = "saves"
+
+
 class TextRenderer:
     """Рендерер текста с поддержкой переноса строк."""
     
@@ -1107,13 +1117,11 @@ class SaveManager:
         self.save_dir = save_dir
         self.slots = {}  # slot_id -> save_data
         self.thumbnails = {}  # slot_id -> pygame.Surface
-        self._ensure_save_dir()
         self._load_saves_info()
     
     def _ensure_save_dir(self):
-        """Создать папку для сохранений."""
-        if not os.path.exists(self.save_dir):
-            os.makedirs(self.save_dir)
+        """Создать папку для сохранений (лениво, при первом сохранении)."""
+        os.makedirs(self.save_dir, exist_ok=True)
     
     def _load_saves_info(self):
         """Загрузить информацию о всех сохранениях."""
@@ -1166,6 +1174,7 @@ class SaveManager:
             'game_state': game_state or {}
         }
         
+        self._ensure_save_dir()
         filepath = os.path.join(self.save_dir, f"save_{slot_id}.json")
         with open(filepath, 'w', encoding='utf-8') as f:
             json.dump(save_data, f, ensure_ascii=False, indent=2)
@@ -2476,6 +2485,12 @@ class VisualNovelEngine:
         # Звуковой канал для реплик
         self.dialog_sound_channel = pygame.mixer.Channel(1)  # Канал 1 для звуков диалога
     
+    @classmethod
+    def from_config(cls, config: GameLaunchConfig, debug_mode: bool = False) -> "VisualNovelEngine":
+        """Создать движок из параметров запуска."""
+        return cls(config.width, config.height, config.title,
+                   debug_mode=debug_mode, save_dir=config.save_dir)
+    
     def _play_dialog_sound(self, sound_path: str):
         """Воспроизвести звук для реплики."""
         try:
@@ -6,25 +6,40 @@
 import sys
 import os
 import subprocess
+import importlib
 
 
-# Необходимые пакеты: (имя для import, имя для pip install)
-REQUIRED_PACKAGES = [
-    ("pygame", "pygame-ce"),      # pygame-ce - улучшенная версия pygame
-    ("PIL", "Pillow"),            # Pillow для работы с изображениями
-    ("requests", "requests"),     # requests для HTTP запросов
-    ("tkinter", None),            # tkinter - встроен в Python, но проверим
-]
+# Необходимые пакеты: имена для import и соответствующие имена для pip install
+_IMPORT_NAMES = (
+    "pygame",      # pygame-ce - улучшенная версия pygame
+    "PIL",         # Pillow для работы с изображениями
+    "requests",    # requests для HTTP запросов
+    "tkinter",     # tkinter - встроен в Python, но проверим
+)
+_PIP_NAMES = ("pygame-ce", "Pillow", "requests", None)
+
+
+def _run_pip(cmd) -> bool:
+    """Запустить pip и дождаться завершения.
+    
+    Успех определяется только по коду возврата: pip может напечатать
+    строку ERROR (например, предупреждение резолвера зависимостей)
+    и после успешной установки.
+    """
+    return subprocess.run(cmd, capture_output=True, text=True).returncode == 0
 
 
 def check_and_install_packages():
     """Проверить и установить необходимые пакеты автоматически."""
     missing_packages = []
     
-    for import_name, pip_name in REQUIRED_PACKAGES:
+    for i, import_name in enumerate(_IMPORT_NAMES):
+        # Именно импорт, а не find_spec: у tkinter спецификация находится
+        # и без модуля _tkinter, а сломанная установка пакета видна только при импорте
         try:
-            __import__(import_name)
+            importlib.import_module(import_name)
         except ImportError:
+            pip_name = _PIP_NAMES[i]
             if pip_name:  # Можно установить через pip
                 missing_packages.append((import_name, pip_name))
             else:
@@ -62,8 +77,7 @@ def check_and_install_packages():
         installed = False
         for cmd in install_commands:
             try:
-                result = subprocess.run(cmd, capture_output=True, text=True)
-                if result.returncode == 0:
+                if _run_pip(cmd):
                     print(f"  ✓ {pip_name}")
                     installed = True
                     break
@@ -94,22 +108,25 @@ def run_editor():
     editor_main()
 
 
+def _play_story(story, filepath: str):
+    """Запустить загруженную историю (сохранения рядом с файлом игры)."""
+    from engine import VisualNovelEngine, GameLaunchConfig
+    
+    # Папка сохранений создаётся движком при первом сохранении
+    config = GameLaunchConfig(1280, 720, story.title,
+                              save_dir=os.path.join(os.path.dirname(filepath), 'saves'))
+    engine = VisualNovelEngine.from_config(config)
+    engine.load_story(story)
+    engine.run()
+
+
 def run_game_from_file(filepath: str = None):
     """Запустить игру из файла."""
-    from engine import VisualNovelEngine
     from story import Story
     
     if filepath:
         # Прямой запуск из указанного файла
-        story = Story.load(filepath)
-        
-        # Сохранения рядом с файлом игры
-        save_dir = os.path.join(os.path.dirname(filepath), 'saves')
-        os.makedirs(save_dir, exist_ok=True)
-        
-        engine = VisualNovelEngine(1280, 720, story.title, save_dir=save_dir)
-        engine.load_story(story)
-        engine.run()
+        _play_story(Story.load(filepath), filepath)
         return
     
     # Папка с проектами
@@ -125,11 +142,11 @@ def run_game_from_file(filepath: str = None):
         print("В папке 'projects' нет проектов (.json файлов)")
         return
     
-    print("\nДоступные проекты:")
-    for i, proj in enumerate(projects, 1):
-        print(f"  {i}. {proj}")
-    print(f"  0. Отмена")
-    print()
+    # Выводим список одной записью вместо print на каждую строку
+    lines = ["\nДоступные проекты:\n"]
+    lines.extend(f"  {i}. {proj}\n" for i, proj in enumerate(projects, 1))
+    lines.append("  0. Отмена\n\n")
+    sys.stdout.write("".join(lines))
     
     choice = input("Выберите проект (номер): ").strip()
     
@@ -150,14 +167,7 @@ def run_game_from_file(filepath: str = None):
     try:
         story = Story.load(filepath)
         print(f"Загружена история: {story.title}")
-        
-        # Сохранения рядом с файлом игры
-        save_dir = os.path.join(os.path.dirname(filepath), 'saves')
-        os.makedirs(save_dir, exist_ok=True)
-        
-        engine = VisualNovelEngine(1280, 720, story.title, save_dir=save_dir)
-        engine.load_story(story)
-        engine.run()
+        _play_story(story, filepath)
     except Exception as e:
         print(f"Ошибка при загрузке: {e}")
 
@@ -166,33 +176,34 @@ def main():
     """Главная функция."""
     # Проверяем аргументы командной строки
     if len(sys.argv) > 1:
-        arg = sys.argv[1].lower()
+        arg = sys.argv[1]
         
-        if arg in ('--editor', '-e'):
-            run_editor()
+        # Точное совпадение без приведения регистра - основной путь
+        handler = _CLI_COMMANDS.get(arg) or _CLI_COMMANDS.get(arg.lower())
+        if handler:
+            handler()
             return
         
-        elif arg in ('--play', '-p') and len(sys.argv) > 2:
+        # --play требует аргумент с путём к файлу
+        if arg.lower() in _PLAY_FLAGS and len(sys.argv) > 2:
             run_game_from_file(sys.argv[2])
             return
-        
-        elif arg in ('--console', '-c'):
-            # Запуск в консольном режиме (старое поведение)
-            _run_console_menu()
-            return
-        
-        elif arg in ('--help', '-h'):
-            print("Использование:")
-            print("  python main.py              - GUI лаунчер")
-            print("  python main.py --editor     - Запустить редактор")
-            print("  python main.py --play FILE  - Запустить игру из файла")
-            print("  python main.py --console    - Консольное меню (старый режим)")
-            return
     
     # По умолчанию запускаем GUI-лаунчер
     run_launcher()
 
 
+def _print_help():
+    """Вывести справку по аргументам командной строки."""
+    print("Использование:")
+    print("  python main.py              - GUI лаунчер")
+    print("  python main.py --editor     - Запустить редактор")
+    print("  python main.py --play FILE  - Запустить игру из файла")
+    print("  python main.py --console    - Консольное меню (старый режим)")
+    print()
+    print("  --offline, --skip-deps      - Не проверять зависимости при запуске")
+
+
 def _run_console_menu():
     """Консольное меню (старое поведение)."""
     while True:
@@ -218,7 +229,29 @@ def _run_console_menu():
             print("Неверный выбор. Попробуйте снова.")
 
 
+# Аргументы командной строки без параметров: флаг -> обработчик
+_CLI_COMMANDS = {
+    '--editor': run_editor,
+    '-e': run_editor,
+    '--console': _run_console_menu,  # Консольный режим (старое поведение)
+    '-c': _run_console_menu,
+    '--help': _print_help,
+    '-h': _print_help,
+}
+
+_PLAY_FLAGS = ('--play', '-p')
+
+# Флаги пропуска проверки зависимостей (для уже настроенного окружения)
+_SKIP_DEPS_FLAGS = ('--offline', '--skip-deps')
+
+
 if __name__ == "__main__":
+    skip_deps = False
+    for flag in _SKIP_DEPS_FLAGS:
+        while flag in sys.argv:
+            sys.argv.remove(flag)
+            skip_deps = True
+    
     # Проверяем зависимости перед запуском
-    if check_and_install_packages():
+    if skip_deps or check_and_install_packages():
         main()
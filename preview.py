@@ -7,8 +7,160 @@ import pygame
 import threading
 import queue
 import os
+from bisect import bisect_right
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
 from typing import Optional, Dict, List, Tuple, Callable, Any
-from dataclasses import dataclass
+from dataclasses import dataclass, field, fields, is_dataclass
+
+try:
+    from PIL import Image
+    HAS_PIL = True
+except ImportError:
+    HAS_PIL = False
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+
+# Сколько последних трансформаций хранить для каждого объекта
+_TRANSFORM_CACHE_SIZE = 8
+
+# Максимум команд от редактора, обрабатываемых за один кадр
+_COMMANDS_PER_FRAME = 256
+
+# Сколько отрендеренных текстов с обводкой хранить
+_TEXT_CACHE_SIZE = 128
+
+# Сколько загруженных и вписанных в окно изображений хранить
+_SURFACE_CACHE_SIZE = 128
+
+# Потоков для параллельного чтения изображений сцены
+_LOADER_THREADS = 4
+
+# Как часто перерисовывать предпросмотр меню в простое, мс (редактор может
+# менять общий конфиг напрямую, не присылая команд)
+_IDLE_REDRAW_MS = 250
+
+# Сколько превью меню паузы ждёт команду в простое, с (задержка реакции на мышь)
+_IDLE_WAIT = 1 / 30
+
+# Сколько разобранных HEX-цветов хранить
+_COLOR_CACHE_SIZE = 256
+
+# Сколько масштабированных копий логотипа меню хранить
+_LOGO_CACHE_SIZE = 16
+
+# Изменения трансформаций меньше этих порогов не видны - изображение не перестраивается
+_ROTATION_EPSILON = 0.25
+_SCALE_EPSILON = 0.005
+_SKEW_EPSILON = 0.005
+
+
+def _coalesce_motion(events: List[pygame.event.Event]) -> List[pygame.event.Event]:
+    """Оставить из каждой серии подряд идущих MOUSEMOTION только последнее.
+    
+    Обработчики перетаскивания берут абсолютную позицию, поэтому промежуточные
+    движения ничего не меняют. Порядок относительно нажатий сохраняется.
+    """
+    motion = pygame.MOUSEMOTION
+    return [event for event, next_event in zip(events, events[1:] + [None])
+            if event.type != motion or next_event is None or next_event.type != motion]
+
+
+def _allow_events(event_types: List[int]):
+    """Пропускать в очередь только события, которые окно обрабатывает."""
+    pygame.event.set_blocked(None)
+    pygame.event.set_allowed(event_types)
+
+
+def _load_raw_image(path: str) -> Optional[pygame.Surface]:
+    """Прочитать и декодировать файл изображения (можно вызывать из любого потока)."""
+    try:
+        return pygame.image.load(path)
+    except (pygame.error, OSError):
+        return None
+
+
+@lru_cache(maxsize=_COLOR_CACHE_SIZE)
+def _hex_to_rgba(hex_color: str) -> Tuple[int, int, int, int]:
+    """Конвертировать HEX ("#RRGGBB" или "#RRGGBBAA") в RGBA.
+    
+    Цвета меню - небольшой набор строк, которые разбираются каждый кадр,
+    поэтому результат кэшируется.
+    """
+    hex_color = hex_color.lstrip('#')
+    if len(hex_color) == 6:
+        r, g, b = int(hex_color[0:2], 16), int(hex_color[2:4], 16), int(hex_color[4:6], 16)
+        return (r, g, b, 255)
+    elif len(hex_color) == 8:
+        r, g, b, a = int(hex_color[0:2], 16), int(hex_color[2:4], 16), int(hex_color[4:6], 16), int(hex_color[6:8], 16)
+        return (r, g, b, a)
+    return (255, 255, 255, 255)
+
+
+@lru_cache(maxsize=_COLOR_CACHE_SIZE)
+def _hex_to_rgb(hex_color: str) -> Tuple[int, int, int]:
+    """Конвертировать HEX в RGB (альфа отбрасывается)."""
+    return _hex_to_rgba(hex_color)[:3]
+
+
+@lru_cache(maxsize=None)
+def _field_names(cls: type) -> frozenset:
+    """Имена полей класса конфига (для dataclass - из fields(), иначе пусто)."""
+    return frozenset(f.name for f in fields(cls)) if is_dataclass(cls) else frozenset()
+
+
+def _apply_fields(obj, kwargs: Dict[str, Any]):
+    """Присвоить объекту конфига значения из kwargs, пропуская неизвестные имена.
+    
+    Набор полей считается один раз на класс - без hasattr на каждый ключ.
+    Объекты не-dataclass обновляются как раньше, через hasattr.
+    """
+    names = _field_names(type(obj))
+    for key, value in kwargs.items():
+        if key in names or (not names and hasattr(obj, key)):
+            setattr(obj, key, value)
+
+
+@contextmanager
+def _locked(surface: pygame.Surface):
+    """Держать surface заблокированной на время серии примитивов draw.
+    
+    Без этого каждый вызов draw блокирует и разблокирует surface сам.
+    Внутри блока нельзя делать blit - SDL его отклонит.
+    """
+    surface.lock()
+    try:
+        yield surface
+    finally:
+        surface.unlock()
+
+
+def _vertical_gradient(width: int, height: int, top: Tuple[int, int, int],
+                       delta: Tuple[int, int, int]) -> pygame.Surface:
+    """Вертикальный градиент от цвета top до top + delta (нужно окно для convert)."""
+    surface = pygame.Surface((width, height)).convert()
+    
+    if HAS_NUMPY:
+        # Цвет зависит только от y - одна строка цветов на все столбцы
+        t = np.arange(height) / height
+        colors = np.stack([top[i] + t * delta[i] for i in range(3)], axis=1).astype(np.uint8)
+        pixels = pygame.surfarray.pixels3d(surface)
+        pixels[:] = colors[None, :, :]
+        del pixels  # Разблокировать surface
+        return surface
+    
+    with _locked(surface):
+        for y in range(height):
+            color = tuple(int(top[i] + (y / height) * delta[i]) for i in range(3))
+            pygame.draw.line(surface, color, (0, y), (width, y))
+    return surface
 
 
 @dataclass
@@ -30,6 +182,8 @@ class DraggableCharacter:
     emotion: str = "default"
     is_selected: bool = False
     is_dragging: bool = False
+    # Параметры, по которым построено текущее image
+    applied_transform: Optional[tuple] = None
 
 
 @dataclass
@@ -52,6 +206,8 @@ class DraggableImage:
     layer: int = 0  # Слой для порядка отрисовки
     is_selected: bool = False
     is_dragging: bool = False
+    # Параметры, по которым построено текущее image
+    applied_transform: Optional[tuple] = None
 
 
 @dataclass
@@ -73,12 +229,54 @@ class DraggableText:
     surface: Optional[pygame.Surface] = None
 
 
+@dataclass
+class GameSprite:
+    """Персонаж или картинка в предпросмотре игры."""
+    x: float = 0.5
+    y: float = 0.5
+    scale: float = 1.0
+    rotation: float = 0.0
+    alpha: int = 255
+    flip_x: bool = False
+    flip_y: bool = False
+    layer: int = 0
+    image: Optional[pygame.Surface] = None
+    original_image: Optional[pygame.Surface] = None
+    # Исходное изображение полностью непрозрачно (проверяется при загрузке)
+    opaque: bool = False
+    # (исходное изображение, (scale, rotation, alpha), результат) последней трансформации
+    transformed: Optional[tuple] = None
+
+
+@dataclass
+class GameAnimation:
+    """Запущенная анимация персонажа или картинки в предпросмотре игры."""
+    keyframes: List[Dict]
+    loop: bool
+    start_time: int
+    # Фоновая анимация сцены (не сбрасывается сменой реплики)
+    background: bool = False
+    # Времена кадров и значения (x, y, scale, rotation, alpha) с подставленными умолчаниями
+    times: List[float] = field(init=False)
+    values: List[tuple] = field(init=False)
+    # Индекс отрезка на прошлом кадре - подсказка для поиска
+    segment: int = 0
+    
+    def __post_init__(self):
+        self.times = [kf['time'] for kf in self.keyframes]
+        self.values = [(kf.get('x', 0.5), kf.get('y', 0.7), kf.get('scale', 1.0),
+                        kf.get('rotation', 0), kf.get('alpha', 1.0)) for kf in self.keyframes]
+
+
 class ScenePreview:
     """Окно предпросмотра сцены в pygame."""
     
     def __init__(self, width: int = 960, height: int = 540):
         self.width = width
         self.height = height
+        # Обратные размеры для перевода пикселей в доли экрана
+        self._w_inv = 1.0 / width
+        self._h_inv = 1.0 / height
         self.running = False
         self.screen: Optional[pygame.Surface] = None
         
@@ -107,11 +305,58 @@ class ScenePreview:
         self.on_keyframe_added: Optional[Callable] = None
         self.on_animation_saved: Optional[Callable] = None  # Callback при сохранении анимации
         
-        # Очередь команд от главного потока
-        self.command_queue = queue.Queue()
+        # Очередь команд от главного потока (SimpleQueue - без лишних блокировок)
+        self.command_queue = queue.SimpleQueue()
         
         # Кэш изображений
         self.image_cache: Dict[str, pygame.Surface] = {}
+        # Кэш фонов, уже приведённых к размеру окна
+        self._bg_cache: Dict[str, pygame.Surface] = {}
+        # Кэш трансформированных изображений: (тип, id) -> {параметры: Surface}
+        self._transform_cache: Dict[Tuple[str, str], OrderedDict] = {}
+        # Последняя основа без поворота: (тип, id) -> (параметры, Surface)
+        self._transform_base: Dict[Tuple[str, str], Tuple[tuple, pygame.Surface]] = {}
+        # Кэш текстов с обводкой: (текст, размер, цвет, цвет обводки, толщина) -> Surface
+        self._outline_cache: OrderedDict = OrderedDict()
+        # Кэш готовых текстов с учётом масштаба и поворота
+        self._text_cache: OrderedDict = OrderedDict()
+        # Шрифты по размеру
+        self.fonts: Dict[int, pygame.font.Font] = {}
+        # Точки путей анимации в пикселях: id -> (список кадров, число кадров, точки)
+        self._path_points: Dict[str, Tuple[List[Dict], int, List[Tuple[int, int]]]] = {}
+        # Градиентный фон по умолчанию и сетка (рисуются один раз при первой отрисовке)
+        self._gradient_bg: Optional[pygame.Surface] = None
+        self._grid_surface: Optional[pygame.Surface] = None
+        # Панель UI: полупрозрачные полосы по высоте и строка подсказок по состоянию
+        self._ui_bars: Dict[int, pygame.Surface] = {}
+        self._ui_hints: Dict[Tuple[bool, bool], List[Tuple[pygame.Surface, Tuple[int, int]]]] = {}
+        # Подписи объектов на сцене: (текст, цвет) -> Surface
+        self._label_cache: OrderedDict = OrderedDict()
+        # Готовые кружки маркеров: (цвет, радиус, цвет обводки) -> Surface
+        self._markers: Dict[tuple, pygame.Surface] = {}
+        
+        # Индекс для проверки попадания мышью (перестраивается при изменении границ):
+        # объекты в порядке приоритета клика и их границы по отдельным массивам
+        self._hit_dirty = True
+        self._hit_entries: List[Tuple[str, str]] = []  # (тип, id)
+        self._hit_positions: Dict[Tuple[str, str], int] = {}  # (тип, id) -> индекс в массивах
+        self._hit_rects: List[pygame.Rect] = []
+        self._hit_bounds = None  # (left, top, right, bottom) - массивы numpy
+        # Без numpy: сетка ячеек -> индексы объектов (по возрастанию, т.е. по приоритету)
+        self._hit_grid: Dict[Tuple[int, int], List[int]] = {}
+        self._hit_cell = 64
+        
+        # Перерисовка только изменившихся областей: состояние прошлого кадра
+        self._frame_state: Optional[Dict[Tuple[str, str], Tuple[pygame.Rect, tuple]]] = None
+        self._frame_globals: Optional[tuple] = None
+        # Прямоугольники объектов текущего кадра: (тип, id) -> Rect (считаются один раз за кадр)
+        self._frame_rects: Dict[Tuple[str, str], pygame.Rect] = {}
+        # Картинки, отсортированные по слою (None - пересортировать)
+        self._images_sorted: Optional[List[DraggableImage]] = None
+        # Нужно ли перерисовать кадр (были события или команды)
+        self._frame_dirty = True
+        # Зажата ли ЛКМ (по событиям нажатия/отпускания)
+        self._lmb_down = False
         
         # UI
         self.show_grid = True
@@ -130,23 +375,50 @@ class ScenePreview:
     def _run(self):
         """Главный цикл pygame."""
         pygame.init()
+        # Без SCALED: он увеличивает окно до кратного размера экрана и выводит
+        # кадр целиком, что сводит на нет display.update по изменившимся областям
         self.screen = pygame.display.set_mode((self.width, self.height))
         pygame.display.set_caption("preview")
+        _allow_events([pygame.QUIT, pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE, pygame.KEYDOWN,
+                       pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEMOTION,
+                       pygame.MOUSEWHEEL])
         clock = pygame.time.Clock()
         
-        font = pygame.font.Font(None, 24)
+        self.fonts = {}  # Шрифты прошлого запуска недействительны после pygame.quit()
+        self._ui_hints.clear()
+        self._label_cache.clear()
+        font = self._get_font(24)
+        
+        # Ввод мыши, который стоит обработать в том же кадре, не дожидаясь тика
+        input_events = [pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP]
+        early_pass = False
         
+        self._frame_dirty = True
         while self.running:
+            if not early_pass:
+                frame_start = pygame.time.get_ticks()
+            
             # Обработка команд от главного потока
             self._process_commands()
             
+            # Ждём событие не дольше кадра: в простое поток спит, а не перерисовывает сцену
+            event = pygame.event.wait(16)
+            events = [event] + pygame.event.get() if event.type != pygame.NOEVENT else []
+            if events:
+                self._frame_dirty = True
+                events = _coalesce_motion(events)
+            
             # Обработка событий pygame
-            for event in pygame.event.get():
+            for event in events:
                 if event.type == pygame.QUIT:
                     self.running = False
+                
+                elif event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE):
+                    self._frame_state = None  # Окно нужно перерисовать целиком
                     
                 elif event.type == pygame.MOUSEBUTTONDOWN:
                     if event.button == 1:  # ЛКМ
+                        self._lmb_down = True
                         self._handle_mouse_down(event.pos)
                     elif event.button == 3:  # ПКМ - добавить ключевой кадр
                         if self.is_recording and self.selected_character:
@@ -154,10 +426,11 @@ class ScenePreview:
                             
                 elif event.type == pygame.MOUSEBUTTONUP:
                     if event.button == 1:
+                        self._lmb_down = False
                         self._handle_mouse_up(event.pos)
                         
                 elif event.type == pygame.MOUSEMOTION:
-                    if pygame.mouse.get_pressed()[0]:  # ЛКМ зажата
+                    if self._lmb_down:  # ЛКМ зажата
                         self._handle_mouse_drag(event.pos)
                         
                 elif event.type == pygame.MOUSEWHEEL:
@@ -263,54 +536,104 @@ class ScenePreview:
                             self._update_image_transform(img)
                             self._notify_image_position_changed(img)
             
-            # Отрисовка
-            self._draw(font)
-            pygame.display.flip()
+            # Отрисовка (на экран выводятся только изменившиеся области);
+            # во время записи каждый кадр обновляется таймер
+            if self._frame_dirty or self.is_recording:
+                self._frame_dirty = False
+                dirty_rects = self._draw(font)
+                if dirty_rects:
+                    pygame.display.update(dirty_rects)
+            
+            # Если до конца кадра ещё есть время, а мышь уже прислала события -
+            # обработать их и перерисовать сразу (не больше одного раза за кадр)
+            if (not early_pass and pygame.time.get_ticks() - frame_start < 12
+                    and pygame.event.peek(input_events)):
+                early_pass = True
+                continue
+            early_pass = False
             clock.tick(60)
         
         pygame.quit()
     
     def _process_commands(self):
-        """Обработать команды от главного потока."""
-        while not self.command_queue.empty():
+        """Обработать команды от главного потока.
+        
+        За кадр обрабатывается не больше _COMMANDS_PER_FRAME команд,
+        остаток дождётся следующего кадра. Из подряд идущих обновлений
+        одного персонажа применяется только последнее.
+        """
+        pending_updates: Dict[str, tuple] = {}  # char_id -> последние аргументы update_character
+        
+        for _ in range(_COMMANDS_PER_FRAME):
             try:
                 cmd, args = self.command_queue.get_nowait()
-                if cmd == 'set_background':
-                    self._load_background(args)
-                elif cmd == 'set_background_color':
-                    self.background_color = args
-                elif cmd == 'add_character':
-                    self._add_character(*args)
-                elif cmd == 'remove_character':
-                    self._remove_character(args)
-                elif cmd == 'update_character':
-                    self._update_character(*args)
-                elif cmd == 'add_image':
-                    self._add_image(*args)
-                elif cmd == 'remove_image':
-                    self._remove_image(args)
-                elif cmd == 'add_text':
-                    self._add_text(*args)
-                elif cmd == 'remove_text':
-                    self._remove_text(args)
-                elif cmd == 'clear':
-                    self.characters.clear()
-                    self.images.clear()
-                    self.texts.clear()
-                    self.background = None
-                    self.background_color = None
             except queue.Empty:
                 break
+            self._frame_dirty = True
+            
+            if cmd == 'update_character':
+                pending_updates.pop(args[0], None)  # Сохраняем порядок по последнему обновлению
+                pending_updates[args[0]] = args
+                continue
+            
+            # Остальные команды применяются после отложенных обновлений
+            if pending_updates:
+                self._flush_character_updates(pending_updates)
+            
+            if cmd == 'set_background':
+                self._load_background(args)
+            elif cmd == 'set_background_color':
+                self.background_color = args
+            elif cmd == 'add_character':
+                self._add_character(*args)
+            elif cmd == 'remove_character':
+                self._remove_character(args)
+            elif cmd == 'add_image':
+                self._add_image(*args)
+            elif cmd == 'remove_image':
+                self._remove_image(args)
+            elif cmd == 'add_text':
+                self._add_text(*args)
+            elif cmd == 'remove_text':
+                self._remove_text(args)
+            elif cmd == 'clear':
+                self.characters.clear()
+                self.images.clear()
+                self._images_sorted = None
+                self.texts.clear()
+                self._transform_cache.clear()
+                self._transform_base.clear()
+                self._path_points.clear()
+                self._bg_cache.clear()
+                self._hit_dirty = True
+                self.background = None
+                self.background_color = None
+        
+        if pending_updates:
+            self._flush_character_updates(pending_updates)
+    
+    def _flush_character_updates(self, pending_updates: Dict[str, tuple]):
+        """Применить накопленные обновления персонажей."""
+        for args in pending_updates.values():
+            self._update_character(*args)
+        pending_updates.clear()
     
     def _load_background(self, path: str):
         """Загрузить фон."""
+        cached = self._bg_cache.get(path)
+        if cached is not None:
+            self.background = cached
+            return
+        
         if not path or not os.path.exists(path):
             self.background = None
             return
         
         try:
             bg = pygame.image.load(path).convert()
-            self.background = pygame.transform.scale(bg, (self.width, self.height))
+            if bg.get_size() != (self.width, self.height):
+                bg = pygame.transform.scale(bg, (self.width, self.height))
+            self.background = self._bg_cache[path] = bg
         except pygame.error:
             self.background = None
     
@@ -335,49 +658,116 @@ class ScenePreview:
         # Загрузка изображения
         if image_path and os.path.exists(image_path):
             try:
-                if image_path not in self.image_cache:
-                    img = pygame.image.load(image_path).convert_alpha()
-                    # Масштабируем большие картинки под размер окна
-                    scale_h = self.height * 0.8 / max(img.get_height(), 1)
-                    scale_w = self.width * 0.8 / max(img.get_width(), 1)
-                    base_scale = min(scale_h, scale_w, 1.0)  # Не увеличиваем маленькие
-                    if base_scale < 1.0:
-                        new_size = (int(img.get_width() * base_scale), int(img.get_height() * base_scale))
-                        img = pygame.transform.smoothscale(img, new_size)
-                    self.image_cache[image_path] = img
-                char.original_image = self.image_cache[image_path]
+                char.original_image = self._load_image(image_path)
                 # Применяем трансформации
                 self._update_transformed_image(char)
             except pygame.error:
                 pass
         
         self.characters[char_id] = char
+        self._hit_dirty = True
+    
+    def _load_image(self, image_path: str) -> pygame.Surface:
+        """Загрузить картинку в кэш (в формате экрана, вписанную в окно)."""
+        img = self.image_cache.get(image_path)
+        if img is not None:
+            return img
+        
+        img = pygame.image.load(image_path).convert_alpha()
+        # Масштабируем большие картинки под размер окна - учитываем и ширину и высоту
+        scale_h = self.height * 0.8 / max(img.get_height(), 1)
+        scale_w = self.width * 0.8 / max(img.get_width(), 1)
+        base_scale = min(scale_h, scale_w, 1.0)  # Не увеличиваем маленькие
+        if base_scale < 1.0:
+            new_size = (int(img.get_width() * base_scale), int(img.get_height() * base_scale))
+            if new_size[0] > 0 and new_size[1] > 0:
+                img = pygame.transform.smoothscale(img, new_size)
+        self.image_cache[image_path] = img
+        return img
     
     def _update_transformed_image(self, char: DraggableCharacter):
         """Обновить изображение с учётом всех трансформаций."""
-        if char.original_image:
-            img = char.original_image
+        self._hit_dirty = True
+        if char.original_image and not self._transform_is_current(char):
+            char.image = self._get_transformed(
+                ('character', char.id), char.original_image, char.scale,
+                char.flip_x, char.flip_y, char.skew_x, char.skew_y, char.rotation
+            )
+    
+    def _transform_is_current(self, obj) -> bool:
+        """Проверить, что image уже соответствует трансформациям объекта.
+        
+        Отличия меньше порогов пропускаются, а запомненные параметры не
+        обновляются - поэтому мелкие шаги накапливаются и не теряются.
+        """
+        applied = obj.applied_transform
+        if (obj.image is not None and applied is not None
+                and applied[0] is obj.original_image
+                and applied[1] == obj.flip_x and applied[2] == obj.flip_y
+                and abs(applied[3] - obj.scale) < _SCALE_EPSILON
+                and abs(applied[4] - obj.rotation) < _ROTATION_EPSILON
+                and abs(applied[5] - obj.skew_x) < _SKEW_EPSILON
+                and abs(applied[6] - obj.skew_y) < _SKEW_EPSILON):
+            return True
+        obj.applied_transform = (obj.original_image, obj.flip_x, obj.flip_y, obj.scale,
+                                 obj.rotation, obj.skew_x, obj.skew_y)
+        return False
+    
+    def _get_transformed(self, cache_id: Tuple[str, str], original: pygame.Surface, scale: float,
+                         flip_x: bool, flip_y: bool, skew_x: float, skew_y: float,
+                         rotation: float) -> pygame.Surface:
+        """Получить трансформированное изображение (из кэша, если уже строилось)."""
+        # Поворот квантуется до 0.1° и применяется именно в таком виде: ключ кэша
+        # совпадает с результатом, а углы, кратные 90°, идут по быстрому пути rotate
+        rotation = round(rotation, 1) % 360
+        base_key = (id(original), round(scale, 3), flip_x, flip_y, round(skew_x, 3), round(skew_y, 3))
+        key = base_key + (rotation,)
+        cache = self._transform_cache.get(cache_id)
+        if cache is None:
+            cache = self._transform_cache[cache_id] = OrderedDict()
+        
+        img = cache.get(key)
+        if img is not None:
+            cache.move_to_end(key)
+            return img
+        
+        # Колесо мыши обычно меняет только поворот - основа без поворота
+        # (масштаб, отзеркаливание, перспектива) строится заново лишь при их изменении
+        base = self._transform_base.get(cache_id)
+        if base is not None and base[0] == base_key:
+            img = base[1]
+        else:
+            img = original
             
             # 1. Масштабирование
-            if char.scale != 1.0:
-                new_w = int(img.get_width() * char.scale)
-                new_h = int(img.get_height() * char.scale)
+            if scale != 1.0:
+                new_w = int(img.get_width() * scale)
+                new_h = int(img.get_height() * scale)
                 if new_w > 0 and new_h > 0:
                     img = pygame.transform.smoothscale(img, (new_w, new_h))
             
             # 2. Отзеркаливание
-            if char.flip_x or char.flip_y:
-                img = pygame.transform.flip(img, char.flip_x, char.flip_y)
-            
-            # 3. Перспектива (skew) - используем rotozoom для эффекта
-            if char.skew_x != 0 or char.skew_y != 0:
-                img = self._apply_skew(img, char.skew_x, char.skew_y)
+            if flip_x or flip_y:
+                img = pygame.transform.flip(img, flip_x, flip_y)
             
-            # 4. Поворот
-            if char.rotation != 0:
-                img = pygame.transform.rotate(img, char.rotation)
+            # 3. Перспектива (skew)
+            if skew_x != 0 or skew_y != 0:
+                img = self._apply_skew(img, skew_x, skew_y)
             
-            char.image = img
+            # Результат рисуется каждый кадр - приводим к формату экрана один раз
+            # (поворот сохраняет формат)
+            if img is not original:
+                img = img.convert_alpha()
+            self._transform_base[cache_id] = (base_key, img)
+        
+        # 4. Поворот
+        if rotation != 0:
+            img = pygame.transform.rotate(img, rotation)
+        
+        cache[key] = img
+        if len(cache) > _TRANSFORM_CACHE_SIZE:
+            cache.popitem(last=False)
+        return img
     
     def _apply_skew(self, surface: pygame.Surface, skew_x: float, skew_y: float) -> pygame.Surface:
         """Применить эффект перспективы (наклон)."""
@@ -390,8 +780,51 @@ class ScenePreview:
         new_w = w + dx
         new_h = h + dy
         
+        # При skew_y = 1 аффинное преобразование вырождено (строки сходятся
+        # в одну) - такой наклон копируется построчно ниже
+        if HAS_PIL and abs(1.0 - skew_y) >= 1e-6:
+            # Смещения строк линейны по y, значит наклон - аффинное преобразование:
+            # x' = x + ax + bx*y, y' = ay + (1 + by)*y. PIL ждёт обратное отображение.
+            ax = skew_x * w if skew_x >= 0 else 0.0
+            ay = skew_y * h if skew_y >= 0 else 0.0
+            bx = -skew_x * w / h
+            e = 1.0 / (1.0 - skew_y)
+            b = -bx * e
+            coeffs = (1.0, b, -ax - b * ay, 0.0, e, -ay * e)
+            
+            src = Image.frombytes('RGBA', (w, h), pygame.image.tobytes(surface, 'RGBA'))
+            dst = src.transform((new_w, new_h), Image.Transform.AFFINE, coeffs,
+                                resample=Image.Resampling.BILINEAR)
+            return pygame.image.frombytes(dst.tobytes(), (new_w, new_h), 'RGBA').convert_alpha()
+        
         new_surface = pygame.Surface((new_w, new_h), pygame.SRCALPHA)
         
+        if HAS_NUMPY:
+            # Все строки за одну векторную операцию
+            ys = np.arange(h)
+            if skew_x >= 0:
+                offset_x = (skew_x * w * (1 - ys / h)).astype(np.intp)
+            else:
+                offset_x = (-skew_x * w * (ys / h)).astype(np.intp)
+            
+            if skew_y >= 0:
+                offset_y = (skew_y * h * (1 - ys / h)).astype(np.intp)
+            else:
+                offset_y = (-skew_y * h * (ys / h)).astype(np.intp)
+            
+            # Индексы в порядке [y, x]: при наложении строк нижняя перекрывает верхнюю,
+            # как при построчном копировании (surfarray индексируется как [x, y])
+            cols = offset_x[:, None] + np.arange(w)[None, :]
+            rows = (ys + offset_y)[:, None]
+            
+            dst_rgb = pygame.surfarray.pixels3d(new_surface)
+            dst_rgb[cols, rows] = pygame.surfarray.array3d(surface).transpose(1, 0, 2)
+            del dst_rgb
+            dst_alpha = pygame.surfarray.pixels_alpha(new_surface)
+            dst_alpha[cols, rows] = pygame.surfarray.array_alpha(surface).T
+            del dst_alpha  # Разблокировать surface
+            return new_surface
+        
         # Копируем построчно с смещением
         for y in range(h):
             # Вычисляем смещение для этой строки
@@ -415,6 +848,9 @@ class ScenePreview:
         """Удалить персонажа."""
         if char_id in self.characters:
             del self.characters[char_id]
+        self._transform_cache.pop(('character', char_id), None)
+        self._transform_base.pop(('character', char_id), None)
+        self._hit_dirty = True
     
     def _add_image(self, img_id: str, name: str, image_path: str, x: float, y: float, layer: int = 0,
                    rotation: float = 0.0, flip_x: bool = False, flip_y: bool = False,
@@ -438,28 +874,24 @@ class ScenePreview:
         # Загрузка изображения
         if image_path and os.path.exists(image_path):
             try:
-                if image_path not in self.image_cache:
-                    img = pygame.image.load(image_path).convert_alpha()
-                    # Масштабируем под размер окна - учитываем и ширину и высоту
-                    scale_h = self.height * 0.8 / max(img.get_height(), 1)
-                    scale_w = self.width * 0.8 / max(img.get_width(), 1)
-                    base_scale = min(scale_h, scale_w, 1.0)  # Не увеличиваем маленькие
-                    new_size = (int(img.get_width() * base_scale), int(img.get_height() * base_scale))
-                    if new_size[0] > 0 and new_size[1] > 0:
-                        img = pygame.transform.smoothscale(img, new_size)
-                    self.image_cache[image_path] = img
-                img_obj.original_image = self.image_cache[image_path]
+                img_obj.original_image = self._load_image(image_path)
                 # Применяем трансформации
                 self._update_image_transform(img_obj)
             except pygame.error:
                 pass
         
         self.images[img_id] = img_obj
+        self._images_sorted = None
+        self._hit_dirty = True
     
     def _remove_image(self, img_id: str):
         """Удалить картинку."""
         if img_id in self.images:
             del self.images[img_id]
+            self._images_sorted = None
+        self._transform_cache.pop(('image', img_id), None)
+        self._transform_base.pop(('image', img_id), None)
+        self._hit_dirty = True
     
     def _add_text(self, text_id: str, text: str, x: float, y: float, font_size: int = 36,
                   color: Tuple[int, int, int] = (255, 255, 255),
@@ -490,34 +922,26 @@ class ScenePreview:
         self._render_text_surface(text_obj)
         
         self.texts[text_id] = text_obj
+        self._hit_dirty = True
     
     def _remove_text(self, text_id: str):
         """Удалить текст."""
         if text_id in self.texts:
             del self.texts[text_id]
+        self._hit_dirty = True
     
     def _render_text_surface(self, text_obj: DraggableText):
         """Отрендерить текст в surface."""
-        pygame.font.init()
-        font = pygame.font.Font(None, text_obj.font_size)
-        
-        # Основной текст
-        text_surface = font.render(text_obj.text, True, text_obj.color)
+        self._hit_dirty = True
+        key = (text_obj.text, text_obj.font_size, text_obj.color, text_obj.outline_color,
+               text_obj.outline_width, round(text_obj.scale, 3), round(text_obj.rotation, 1))
+        cached = self._text_cache.get(key)
+        if cached is not None:
+            self._text_cache.move_to_end(key)
+            text_obj.surface = cached
+            return
         
-        # Если есть обводка
-        if text_obj.outline_color and text_obj.outline_width > 0:
-            w = text_surface.get_width() + text_obj.outline_width * 2
-            h = text_surface.get_height() + text_obj.outline_width * 2
-            outline_surface = pygame.Surface((w, h), pygame.SRCALPHA)
-            
-            outline_text = font.render(text_obj.text, True, text_obj.outline_color)
-            for dx in range(-text_obj.outline_width, text_obj.outline_width + 1):
-                for dy in range(-text_obj.outline_width, text_obj.outline_width + 1):
-                    if dx != 0 or dy != 0:
-                        outline_surface.blit(outline_text, (text_obj.outline_width + dx, text_obj.outline_width + dy))
-            
-            outline_surface.blit(text_surface, (text_obj.outline_width, text_obj.outline_width))
-            text_surface = outline_surface
+        text_surface = self._render_outlined_text(text_obj)
         
         # Масштаб
         if text_obj.scale != 1.0:
@@ -530,8 +954,47 @@ class ScenePreview:
         if text_obj.rotation != 0:
             text_surface = pygame.transform.rotate(text_surface, -text_obj.rotation)
         
+        self._text_cache[key] = text_surface
+        if len(self._text_cache) > _TEXT_CACHE_SIZE:
+            self._text_cache.popitem(last=False)
         text_obj.surface = text_surface
     
+    def _render_outlined_text(self, text_obj: DraggableText) -> pygame.Surface:
+        """Отрендерить текст с обводкой (результат кэшируется)."""
+        width = text_obj.outline_width if text_obj.outline_color else 0
+        key = (text_obj.text, text_obj.font_size, text_obj.color, text_obj.outline_color, width)
+        cached = self._outline_cache.get(key)
+        if cached is not None:
+            self._outline_cache.move_to_end(key)
+            return cached
+        
+        font = self._get_font(text_obj.font_size)
+        
+        # Основной текст
+        text_surface = font.render(text_obj.text, True, text_obj.color)
+        
+        # Если есть обводка: расширяем маску текста квадратным ядром
+        # (то же, что сдвиги на ±width по обеим осям) и заливаем её цветом обводки
+        if width > 0:
+            kernel = pygame.mask.Mask((width * 2 + 1, width * 2 + 1), fill=True)
+            outline_mask = pygame.mask.from_surface(text_surface, 1).convolve(kernel)
+            outline_surface = outline_mask.to_surface(
+                setcolor=(*text_obj.outline_color, 255), unsetcolor=(0, 0, 0, 0)
+            ).convert_alpha()
+            outline_surface.blit(text_surface, (width, width))
+            text_surface = outline_surface
+        
+        self._outline_cache[key] = text_surface
+        if len(self._outline_cache) > _TEXT_CACHE_SIZE:
+            self._outline_cache.popitem(last=False)
+        return text_surface
+    
+    def _get_font(self, size: int) -> pygame.font.Font:
+        """Получить шрифт."""
+        if size not in self.fonts:
+            self.fonts[size] = pygame.font.Font(None, size)
+        return self.fonts[size]
+    
     def _get_text_rect(self, text_obj: DraggableText) -> pygame.Rect:
         """Получить прямоугольник текста."""
         if text_obj.surface is None:
@@ -552,29 +1015,13 @@ class ScenePreview:
     
     def _update_image_transform(self, img: DraggableImage):
         """Обновить изображение картинки с учётом трансформаций."""
-        if img.original_image:
-            result = img.original_image
-            
-            # 1. Масштабирование
-            if img.scale != 1.0:
-                new_w = int(result.get_width() * img.scale)
-                new_h = int(result.get_height() * img.scale)
-                if new_w > 0 and new_h > 0:
-                    result = pygame.transform.smoothscale(result, (new_w, new_h))
-            
-            # 2. Отзеркаливание
-            if img.flip_x or img.flip_y:
-                result = pygame.transform.flip(result, img.flip_x, img.flip_y)
-            
-            # 3. Перспектива
-            if img.skew_x != 0 or img.skew_y != 0:
-                result = self._apply_skew(result, img.skew_x, img.skew_y)
-            
-            # 4. Поворот
-            if img.rotation != 0:
-                result = pygame.transform.rotate(result, -img.rotation)
-            
-            img.image = result
+        self._hit_dirty = True
+        if img.original_image and not self._transform_is_current(img):
+            # Картинки поворачиваются по часовой стрелке
+            img.image = self._get_transformed(
+                ('image', img.id), img.original_image, img.scale,
+                img.flip_x, img.flip_y, img.skew_x, img.skew_y, -img.rotation
+            )
     
     def _get_image_rect(self, img: DraggableImage) -> pygame.Rect:
         """Получить прямоугольник картинки."""
@@ -603,21 +1050,12 @@ class ScenePreview:
             char.x = x
             char.y = y
             char.emotion = emotion
+            self._hit_dirty = True
             
             # Обновляем изображение если изменилось
             if image_path and os.path.exists(image_path):
                 try:
-                    if image_path not in self.image_cache:
-                        img = pygame.image.load(image_path).convert_alpha()
-                        # Масштабируем большие картинки под размер окна
-                        scale_h = self.height * 0.8 / max(img.get_height(), 1)
-                        scale_w = self.width * 0.8 / max(img.get_width(), 1)
-                        base_scale = min(scale_h, scale_w, 1.0)
-                        if base_scale < 1.0:
-                            new_size = (int(img.get_width() * base_scale), int(img.get_height() * base_scale))
-                            img = pygame.transform.smoothscale(img, new_size)
-                        self.image_cache[image_path] = img
-                    char.original_image = self.image_cache[image_path]
+                    char.original_image = self._load_image(image_path)
                     self._update_transformed_image(char)
                 except pygame.error:
                     pass
@@ -634,94 +1072,163 @@ class ScenePreview:
         y = int(char.y * self.height - h / 2)
         return pygame.Rect(x, y, w, h)
     
+    def _rebuild_hit_index(self):
+        """Перестроить индекс попаданий: персонажи, тексты, картинки; верхние первыми."""
+        entries = []
+        rects = []
+        # Словари хранят порядок добавления (z-порядок) - обходим их с конца без копий
+        for char in reversed(self.characters.values()):
+            entries.append(('character', char.id))
+            rects.append(self._get_character_rect(char))
+        for text_obj in reversed(self.texts.values()):
+            entries.append(('text', text_obj.id))
+            rects.append(self._get_text_rect(text_obj))
+        for img in reversed(self.images.values()):
+            entries.append(('image', img.id))
+            rects.append(self._get_image_rect(img))
+        
+        self._hit_entries = entries
+        self._hit_positions = {entry: i for i, entry in enumerate(entries)}
+        self._hit_rects = rects
+        if HAS_NUMPY:
+            bounds = np.array([(r.left, r.top, r.right, r.bottom) for r in rects],
+                              dtype=np.int32).reshape(-1, 4)
+            self._hit_bounds = tuple(np.ascontiguousarray(bounds[:, i]) for i in range(4))
+        else:
+            self._build_hit_grid(rects)
+        self._hit_dirty = False
+    
+    def _build_hit_grid(self, rects: List[pygame.Rect]):
+        """Разложить границы объектов по ячейкам сетки (размер ячейки - 2 средних размера)."""
+        grid = self._hit_grid
+        grid.clear()
+        if not rects:
+            return
+        avg = sum(r.width + r.height for r in rects) / (2 * len(rects))
+        cell = self._hit_cell = max(64, int(2 * avg))
+        for i, r in enumerate(rects):
+            for cx in range(r.left // cell, (r.right - 1) // cell + 1):
+                for cy in range(r.top // cell, (r.bottom - 1) // cell + 1):
+                    grid.setdefault((cx, cy), []).append(i)
+    
+    def _update_hit_rect(self, entry: Tuple[str, str], rect: pygame.Rect):
+        """Обновить границы одного объекта в индексе, не перестраивая его целиком."""
+        if self._hit_dirty:
+            return
+        i = self._hit_positions.get(entry)
+        if i is None or not HAS_NUMPY:
+            # Сетку ячеек проще перестроить при следующем клике
+            self._hit_dirty = True
+            return
+        self._hit_rects[i] = rect
+        for bound, value in zip(self._hit_bounds, (rect.left, rect.top, rect.right, rect.bottom)):
+            bound[i] = value
+    
+    def _hit_test(self, pos: Tuple[int, int]) -> Optional[Tuple[str, str]]:
+        """Найти верхний объект под курсором: (тип, id) или None."""
+        if self._hit_dirty:
+            self._rebuild_hit_index()
+        if not self._hit_entries:
+            return None
+        
+        if HAS_NUMPY:
+            left, top, right, bottom = self._hit_bounds
+            px, py = pos
+            hits = np.flatnonzero((left <= px) & (px < right) & (top <= py) & (py < bottom))
+            return self._hit_entries[hits[0]] if hits.size else None
+        
+        # Проверяем только объекты из ячейки под курсором
+        cell = self._hit_cell
+        for i in self._hit_grid.get((pos[0] // cell, pos[1] // cell), ()):
+            if self._hit_rects[i].collidepoint(pos):
+                return self._hit_entries[i]
+        return None
+    
     def _handle_mouse_down(self, pos: Tuple[int, int]):
         """Обработка нажатия мыши."""
-        # Сначала проверяем клик по персонажам (в обратном порядке - верхние первые)
-        for char_id in reversed(list(self.characters.keys())):
+        # Верхний объект под курсором: персонажи, затем тексты, затем картинки
+        hit = self._hit_test(pos)
+        
+        if hit and hit[0] == 'character':
+            char_id = hit[1]
             char = self.characters[char_id]
-            rect = self._get_character_rect(char)
             
-            if rect.collidepoint(pos):
-                # Снимаем выделение с картинки и текста если были
-                if self.selected_image:
-                    self.images[self.selected_image].is_selected = False
-                    self.selected_image = None
-                if self.selected_text:
-                    self.texts[self.selected_text].is_selected = False
-                    self.selected_text = None
-                
-                # Выбираем персонажа
-                if self.selected_character:
-                    self.characters[self.selected_character].is_selected = False
-                
-                char.is_selected = True
-                char.is_dragging = True
-                self.selected_character = char_id
-                
-                # Смещение от центра персонажа
-                self.drag_offset = (
-                    pos[0] - char.x * self.width,
-                    pos[1] - char.y * self.height
-                )
-                return
+            # Снимаем выделение с картинки и текста если были
+            if self.selected_image:
+                self.images[self.selected_image].is_selected = False
+                self.selected_image = None
+            if self.selected_text:
+                self.texts[self.selected_text].is_selected = False
+                self.selected_text = None
+            
+            # Выбираем персонажа
+            if self.selected_character:
+                self.characters[self.selected_character].is_selected = False
+            
+            char.is_selected = True
+            char.is_dragging = True
+            self.selected_character = char_id
+            
+            # Смещение от центра персонажа
+            self.drag_offset = (
+                pos[0] - char.x * self.width,
+                pos[1] - char.y * self.height
+            )
+            return
         
-        # Проверяем клик по текстам
-        for text_id in reversed(list(self.texts.keys())):
+        if hit and hit[0] == 'text':
+            text_id = hit[1]
             text_obj = self.texts[text_id]
-            rect = self._get_text_rect(text_obj)
             
-            if rect.collidepoint(pos):
-                # Снимаем выделение с персонажа и картинки если были
-                if self.selected_character:
-                    self.characters[self.selected_character].is_selected = False
-                    self.selected_character = None
-                if self.selected_image:
-                    self.images[self.selected_image].is_selected = False
-                    self.selected_image = None
-                
-                # Выбираем текст
-                if self.selected_text:
-                    self.texts[self.selected_text].is_selected = False
-                
-                text_obj.is_selected = True
-                text_obj.is_dragging = True
-                self.selected_text = text_id
-                
-                # Смещение от центра
-                self.drag_offset = (
-                    pos[0] - text_obj.x * self.width,
-                    pos[1] - text_obj.y * self.height
-                )
-                return
+            # Снимаем выделение с персонажа и картинки если были
+            if self.selected_character:
+                self.characters[self.selected_character].is_selected = False
+                self.selected_character = None
+            if self.selected_image:
+                self.images[self.selected_image].is_selected = False
+                self.selected_image = None
+            
+            # Выбираем текст
+            if self.selected_text:
+                self.texts[self.selected_text].is_selected = False
+            
+            text_obj.is_selected = True
+            text_obj.is_dragging = True
+            self.selected_text = text_id
+            
+            # Смещение от центра
+            self.drag_offset = (
+                pos[0] - text_obj.x * self.width,
+                pos[1] - text_obj.y * self.height
+            )
+            return
         
-        # Проверяем клик по картинкам
-        for img_id in reversed(list(self.images.keys())):
+        if hit and hit[0] == 'image':
+            img_id = hit[1]
             img = self.images[img_id]
-            rect = self._get_image_rect(img)
             
-            if rect.collidepoint(pos):
-                # Снимаем выделение с персонажа и текста если были
-                if self.selected_character:
-                    self.characters[self.selected_character].is_selected = False
-                    self.selected_character = None
-                if self.selected_text:
-                    self.texts[self.selected_text].is_selected = False
-                    self.selected_text = None
-                
-                # Выбираем картинку
-                if self.selected_image:
-                    self.images[self.selected_image].is_selected = False
-                
-                img.is_selected = True
-                img.is_dragging = True
-                self.selected_image = img_id
-                
-                # Смещение от центра
-                self.drag_offset = (
-                    pos[0] - img.x * self.width,
-                    pos[1] - img.y * self.height
-                )
-                return
+            # Снимаем выделение с персонажа и текста если были
+            if self.selected_character:
+                self.characters[self.selected_character].is_selected = False
+                self.selected_character = None
+            if self.selected_text:
+                self.texts[self.selected_text].is_selected = False
+                self.selected_text = None
+            
+            # Выбираем картинку
+            if self.selected_image:
+                self.images[self.selected_image].is_selected = False
+            
+            img.is_selected = True
+            img.is_dragging = True
+            self.selected_image = img_id
+            
+            # Смещение от центра
+            self.drag_offset = (
+                pos[0] - img.x * self.width,
+                pos[1] - img.y * self.height
+            )
+            return
         
         # Клик мимо - снимаем выделение
         if self.selected_character:
@@ -767,38 +1274,33 @@ class ScenePreview:
     
     def _handle_mouse_drag(self, pos: Tuple[int, int]):
         """Обработка перетаскивания."""
+        # Новая позиция с учётом смещения (одна на все перетаскиваемые объекты)
+        new_x = (pos[0] - self.drag_offset[0]) * self._w_inv
+        new_y = (pos[1] - self.drag_offset[1]) * self._h_inv
+        
         if self.selected_character:
             char = self.characters[self.selected_character]
             if char.is_dragging:
-                # Новая позиция с учётом смещения
-                new_x = (pos[0] - self.drag_offset[0]) / self.width
-                new_y = (pos[1] - self.drag_offset[1]) / self.height
-                
                 # Ограничиваем в пределах экрана
                 char.x = max(0.1, min(0.9, new_x))
                 char.y = max(0.1, min(0.95, new_y))
+                self._update_hit_rect(('character', char.id), self._get_character_rect(char))
         
         if self.selected_image:
             img = self.images[self.selected_image]
             if img.is_dragging:
-                # Новая позиция с учётом смещения
-                new_x = (pos[0] - self.drag_offset[0]) / self.width
-                new_y = (pos[1] - self.drag_offset[1]) / self.height
-                
                 # Ограничиваем в пределах экрана
                 img.x = max(0.05, min(0.95, new_x))
                 img.y = max(0.05, min(0.95, new_y))
+                self._update_hit_rect(('image', img.id), self._get_image_rect(img))
         
         if self.selected_text:
             text_obj = self.texts[self.selected_text]
             if text_obj.is_dragging:
-                # Новая позиция с учётом смещения
-                new_x = (pos[0] - self.drag_offset[0]) / self.width
-                new_y = (pos[1] - self.drag_offset[1]) / self.height
-                
                 # Ограничиваем в пределах экрана
                 text_obj.x = max(0.05, min(0.95, new_x))
                 text_obj.y = max(0.05, min(0.95, new_y))
+                self._update_hit_rect(('text', text_obj.id), self._get_text_rect(text_obj))
     
     def _toggle_recording(self):
         """Включить/выключить запись анимации."""
@@ -887,17 +1389,107 @@ class ScenePreview:
     def _delete_selected(self):
         """Удалить выбранного персонажа из сцены."""
         if self.selected_character:
-            del self.characters[self.selected_character]
+            self._remove_character(self.selected_character)
             self.selected_character = None
     
     def _delete_selected_image(self):
         """Удалить выбранную картинку из сцены."""
         if self.selected_image:
-            del self.images[self.selected_image]
+            self._remove_image(self.selected_image)
             self.selected_image = None
     
-    def _draw(self, font: pygame.font.Font):
-        """Отрисовка сцены."""
+    def _draw(self, font: pygame.font.Font) -> List[pygame.Rect]:
+        """Отрисовка сцены. Возвращает области экрана, которые нужно обновить."""
+        dirty_rects = self._collect_dirty_rects()
+        if not dirty_rects:
+            return []
+        
+        # Перерисовываем сцену целиком, но SDL отсекает всё вне изменившихся областей
+        self.screen.set_clip(dirty_rects[0].unionall(dirty_rects[1:]))
+        self._draw_scene(font)
+        self.screen.set_clip(None)
+        return dirty_rects
+    
+    def _collect_dirty_rects(self) -> List[pygame.Rect]:
+        """Сравнить объекты с прошлым кадром и собрать изменившиеся области."""
+        screen_rect = self.screen.get_rect()
+        
+        # Изменения, влияющие на весь экран: фон, сетка, режим записи, пути анимаций
+        frame_globals = (
+            self.background, self.background_color, self.show_grid,
+            self.is_recording, self.recording_target,
+            tuple((obj_id, len(kfs)) for obj_id, kfs in self.animation_keyframes.items())
+        )
+        
+        state = {}
+        rects = self._frame_rects = {}
+        for img in self.images.values():
+            rect = rects[('image', img.id)] = self._get_image_rect(img)
+            state[('image', img.id)] = (
+                self._decorated_rect(rect, img.is_selected),
+                (img.image, rect, img.is_selected, img.name, img.x, img.y, img.layer)
+            )
+        for char in self.characters.values():
+            rect = rects[('character', char.id)] = self._get_character_rect(char)
+            state[('character', char.id)] = (
+                self._decorated_rect(rect, char.is_selected),
+                (char.image, rect, char.is_selected, char.name, char.x, char.y)
+            )
+        for text_obj in self.texts.values():
+            rect = rects[('text', text_obj.id)] = self._get_text_rect(text_obj)
+            state[('text', text_obj.id)] = (
+                self._decorated_rect(rect, text_obj.is_selected),
+                (text_obj.surface, rect, text_obj.is_selected, text_obj.text, text_obj.x, text_obj.y)
+            )
+        
+        prev_state = self._frame_state
+        full_redraw = prev_state is None or frame_globals != self._frame_globals
+        self._frame_state = state
+        self._frame_globals = frame_globals
+        if full_redraw:
+            return [screen_rect]
+        
+        dirty = []
+        for key, (bounds, signature) in state.items():
+            prev = prev_state.get(key)
+            if prev is None:
+                dirty.append(bounds)
+            elif prev[1] != signature:
+                dirty.append(prev[0])
+                dirty.append(bounds)
+        for key in prev_state.keys() - state.keys():
+            dirty.append(prev_state[key][0])
+        
+        # Время записи в UI панели меняется каждый кадр
+        if self.is_recording:
+            dirty.append(pygame.Rect(0, 0, self.width, 60))
+        
+        return [r for r in (rect.clip(screen_rect) for rect in dirty) if r.width and r.height]
+    
+    def _decorated_rect(self, rect: pygame.Rect, is_selected: bool) -> pygame.Rect:
+        """Границы объекта вместе с рамкой, точками масштабирования и подписью."""
+        bounds = rect.inflate(14, 14)
+        if is_selected:
+            # Подпись над объектом может быть шире его самого
+            bounds.union_ip(pygame.Rect(rect.x, rect.y - 25, self.width, 25))
+        return bounds
+    
+    def _draw_frame(self, color: Tuple[int, int, int], rect: pygame.Rect, width: int):
+        """Нарисовать рамку прямоугольника.
+        
+        Заливка полосами вместо pygame.draw.rect(..., width): при включённой
+        обрезке (set_clip) draw.rect рисует лишние линии по краю области обрезки.
+        """
+        if rect.width <= width * 2 or rect.height <= width * 2:
+            self.screen.fill(color, rect)
+            return
+        self.screen.fill(color, (rect.x, rect.y, rect.width, width))
+        self.screen.fill(color, (rect.x, rect.bottom - width, rect.width, width))
+        self.screen.fill(color, (rect.x, rect.y, width, rect.height))
+        self.screen.fill(color, (rect.right - width, rect.y, width, rect.height))
+    
+    def _draw_scene(self, font: pygame.font.Font):
+        """Отрисовать все слои сцены."""
         # Фон
         if self.background:
             self.screen.blit(self.background, (0, 0))
@@ -905,147 +1497,201 @@ class ScenePreview:
             self.screen.fill(self.background_color)
         else:
             # Градиент
-            for y in range(self.height):
-                r = int(30 + (y / self.height) * 20)
-                g = int(30 + (y / self.height) * 30)
-                b = int(50 + (y / self.height) * 40)
-                pygame.draw.line(self.screen, (r, g, b), (0, y), (self.width, y))
+            if self._gradient_bg is None:
+                self._gradient_bg = self._build_gradient()
+            self.screen.blit(self._gradient_bg, (0, 0))
         
         # Сетка
         if self.show_grid:
             self._draw_grid()
         
         # Картинки (сортируем по слою)
-        sorted_images = sorted(self.images.values(), key=lambda img: img.layer)
-        for img in sorted_images:
-            self._draw_image(img, font)
+        if self._images_sorted is None:
+            self._images_sorted = sorted(self.images.values(), key=lambda img: img.layer)
+        sorted_images = self._images_sorted
+        self._draw_batched(sorted_images, 'image', 'image', self._get_image_rect, self._draw_image, font)
         
         # Персонажи
-        for char_id, char in self.characters.items():
-            self._draw_character(char, font)
+        self._draw_batched(self.characters.values(), 'character', 'image', self._get_character_rect,
+                           self._draw_character, font)
         
         # Тексты
-        for text_id, text_obj in self.texts.items():
-            self._draw_text(text_obj, font)
+        self._draw_batched(self.texts.values(), 'text', 'surface', self._get_text_rect, self._draw_text, font)
         
         # UI панель сверху
         self._draw_ui(font)
     
+    def _build_gradient(self) -> pygame.Surface:
+        """Нарисовать градиентный фон по умолчанию в отдельную surface."""
+        return _vertical_gradient(self.width, self.height, (30, 30, 50), (20, 30, 40))
+    
+    def _draw_batched(self, objects, kind: str, surface_attr: str, get_rect: Callable,
+                      draw_single: Callable, font: pygame.font.Font):
+        """Отрисовать объекты, объединяя подряд идущие простые blit в один fblits.
+        
+        Объекты с заглушкой, выделением или путём анимации рисуются по одному,
+        поэтому порядок наложения не меняется. Прямоугольники берутся из уже
+        посчитанных для этого кадра.
+        """
+        rects = self._frame_rects
+        batch = []
+        for obj in objects:
+            rect = rects.get((kind, obj.id))
+            if rect is None:
+                rect = get_rect(obj)
+            surface = getattr(obj, surface_attr)
+            if surface and not obj.is_selected and not self.animation_keyframes.get(obj.id):
+                batch.append((surface, rect.topleft))
+                continue
+            if batch:
+                self.screen.fblits(batch)
+                batch = []
+            draw_single(obj, font, rect)
+        if batch:
+            self.screen.fblits(batch)
+    
     def _draw_grid(self):
         """Отрисовать сетку."""
-        grid_color = (255, 255, 255, 30)
-        
-        # Вертикальные линии
-        for i in range(1, 10):
-            x = int(i * 0.1 * self.width)
-            pygame.draw.line(self.screen, (100, 100, 100), (x, 0), (x, self.height), 1)
-        
-        # Горизонтальные линии
-        for i in range(1, 10):
-            y = int(i * 0.1 * self.height)
-            pygame.draw.line(self.screen, (100, 100, 100), (0, y), (self.width, y), 1)
-        
-        # Центральные линии ярче
-        cx = self.width // 2
-        cy = self.height // 2
-        pygame.draw.line(self.screen, (150, 150, 150), (cx, 0), (cx, self.height), 2)
-        pygame.draw.line(self.screen, (150, 150, 150), (0, cy), (self.width, cy), 2)
-    
-    def _draw_image(self, img: DraggableImage, font: pygame.font.Font):
+        if self._grid_surface is None or self._grid_surface.get_size() != (self.width, self.height):
+            self._grid_surface = self._build_grid()
+        self.screen.blit(self._grid_surface, (0, 0))
+    
+    def _build_grid(self) -> pygame.Surface:
+        """Нарисовать линии сетки на прозрачной surface."""
+        surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+        
+        with _locked(surface):
+            # Вертикальные линии
+            for i in range(1, 10):
+                x = int(i * 0.1 * self.width)
+                pygame.draw.line(surface, (100, 100, 100), (x, 0), (x, self.height), 1)
+            
+            # Горизонтальные линии
+            for i in range(1, 10):
+                y = int(i * 0.1 * self.height)
+                pygame.draw.line(surface, (100, 100, 100), (0, y), (self.width, y), 1)
+            
+            # Центральные линии ярче
+            cx = self.width // 2
+            cy = self.height // 2
+            pygame.draw.line(surface, (150, 150, 150), (cx, 0), (cx, self.height), 2)
+            pygame.draw.line(surface, (150, 150, 150), (0, cy), (self.width, cy), 2)
+        return surface
+    
+    def _draw_image(self, img: DraggableImage, font: pygame.font.Font,
+                    rect: Optional[pygame.Rect] = None):
         """Отрисовать картинку."""
-        rect = self._get_image_rect(img)
+        if rect is None:
+            rect = self._get_image_rect(img)
         
         if img.image:
             self.screen.blit(img.image, rect.topleft)
         else:
             # Заглушка
             pygame.draw.rect(self.screen, (80, 120, 80), rect)
-            pygame.draw.rect(self.screen, (120, 180, 120), rect, 2)
+            self._draw_frame((120, 180, 120), rect, 2)
             
             # Имя внутри
-            name_text = font.render(img.name or img.id, True, (255, 255, 255))
+            name_text = self._render_label(font, img.name or img.id, (255, 255, 255))
             name_rect = name_text.get_rect(center=rect.center)
             self.screen.blit(name_text, name_rect)
         
         # Рамка выделения (зелёная для картинок)
         if img.is_selected:
-            pygame.draw.rect(self.screen, (0, 255, 100), rect, 3)
+            self._draw_frame((0, 255, 100), rect, 3)
             
             # Подпись с позицией и ID
-            pos_text = font.render(f"[IMG] {img.id} ({img.name}): ({img.x:.2f}, {img.y:.2f}) L{img.layer}", True, (0, 255, 100))
+            pos_text = self._render_label(font, f"[IMG] {img.id} ({img.name}): ({img.x:.2f}, {img.y:.2f}) L{img.layer}", (0, 255, 100))
             self.screen.blit(pos_text, (rect.x, rect.y - 25))
             
             # Точки масштабирования
-            for corner in [(rect.left, rect.top), (rect.right, rect.top),
-                          (rect.left, rect.bottom), (rect.right, rect.bottom)]:
-                pygame.draw.circle(self.screen, (0, 255, 100), corner, 6)
+            self._draw_markers(self._get_marker((0, 255, 100), 6),
+                               [(rect.left, rect.top), (rect.right, rect.top),
+                                (rect.left, rect.bottom), (rect.right, rect.bottom)])
         
         # Отображение ключевых кадров анимации для картинки
         if img.id in self.animation_keyframes and self.animation_keyframes[img.id]:
             self._draw_animation_path(img.id, (0, 255, 100))
     
-    def _draw_character(self, char: DraggableCharacter, font: pygame.font.Font):
+    def _draw_character(self, char: DraggableCharacter, font: pygame.font.Font,
+                        rect: Optional[pygame.Rect] = None):
         """Отрисовать персонажа."""
-        rect = self._get_character_rect(char)
+        if rect is None:
+            rect = self._get_character_rect(char)
         
         if char.image:
             self.screen.blit(char.image, rect.topleft)
         else:
             # Заглушка
             pygame.draw.rect(self.screen, (100, 100, 150), rect)
-            pygame.draw.rect(self.screen, (150, 150, 200), rect, 2)
+            self._draw_frame((150, 150, 200), rect, 2)
             
             # Имя внутри
-            name_text = font.render(char.name or char.id, True, (255, 255, 255))
+            name_text = self._render_label(font, char.name or char.id, (255, 255, 255))
             name_rect = name_text.get_rect(center=rect.center)
             self.screen.blit(name_text, name_rect)
         
         # Рамка выделения
         if char.is_selected:
-            pygame.draw.rect(self.screen, (255, 200, 0), rect, 3)
+            self._draw_frame((255, 200, 0), rect, 3)
             
             # Подпись с позицией
-            pos_text = font.render(f"{char.name}: ({char.x:.2f}, {char.y:.2f})", True, (255, 255, 0))
+            pos_text = self._render_label(font, f"{char.name}: ({char.x:.2f}, {char.y:.2f})", (255, 255, 0))
             self.screen.blit(pos_text, (rect.x, rect.y - 25))
             
             # Точки масштабирования
-            for corner in [(rect.left, rect.top), (rect.right, rect.top),
-                          (rect.left, rect.bottom), (rect.right, rect.bottom)]:
-                pygame.draw.circle(self.screen, (255, 200, 0), corner, 6)
+            self._draw_markers(self._get_marker((255, 200, 0), 6),
+                               [(rect.left, rect.top), (rect.right, rect.top),
+                                (rect.left, rect.bottom), (rect.right, rect.bottom)])
         
         # Отображение ключевых кадров анимации
         if char.id in self.animation_keyframes and self.animation_keyframes[char.id]:
             self._draw_animation_path(char.id, (255, 200, 0))
     
-    def _draw_text(self, text_obj: DraggableText, font: pygame.font.Font):
+    def _draw_text(self, text_obj: DraggableText, font: pygame.font.Font,
+                   rect: Optional[pygame.Rect] = None):
         """Отрисовать текстовый элемент."""
-        rect = self._get_text_rect(text_obj)
+        if rect is None:
+            rect = self._get_text_rect(text_obj)
         
         if text_obj.surface:
             self.screen.blit(text_obj.surface, rect.topleft)
         else:
             # Заглушка
             pygame.draw.rect(self.screen, (50, 50, 80), rect)
-            pygame.draw.rect(self.screen, (100, 100, 150), rect, 2)
+            self._draw_frame((100, 100, 150), rect, 2)
             
             # Текст внутри
             preview_text = text_obj.text[:15] + "..." if len(text_obj.text) > 15 else text_obj.text
-            name_text = font.render(preview_text, True, (255, 255, 255))
+            name_text = self._render_label(font, preview_text, (255, 255, 255))
             name_rect = name_text.get_rect(center=rect.center)
             self.screen.blit(name_text, name_rect)
         
         # Рамка выделения
         if text_obj.is_selected:
-            pygame.draw.rect(self.screen, (100, 200, 255), rect, 3)
+            self._draw_frame((100, 200, 255), rect, 3)
             
             # Подпись с позицией
-            pos_text = font.render(f"[TXT] {text_obj.id}: ({text_obj.x:.2f}, {text_obj.y:.2f})", True, (100, 200, 255))
+            pos_text = self._render_label(font, f"[TXT] {text_obj.id}: ({text_obj.x:.2f}, {text_obj.y:.2f})", (100, 200, 255))
             self.screen.blit(pos_text, (rect.x, rect.y - 25))
             
             # Точки масштабирования
-            for corner in [(rect.left, rect.top), (rect.right, rect.top),
-                          (rect.left, rect.bottom), (rect.right, rect.bottom)]:
-                pygame.draw.circle(self.screen, (100, 200, 255), corner, 6)
+            self._draw_markers(self._get_marker((100, 200, 255), 6),
+                               [(rect.left, rect.top), (rect.right, rect.top),
+                                (rect.left, rect.bottom), (rect.right, rect.bottom)])
+    
+    def _render_label(self, font: pygame.font.Font, text: str,
+                      color: Tuple[int, int, int]) -> pygame.Surface:
+        """Отрендерить подпись (из кэша, если такая уже рисовалась)."""
+        key = (text, color)
+        label = self._label_cache.get(key)
+        if label is not None:
+            self._label_cache.move_to_end(key)
+            return label
+        label = self._label_cache[key] = font.render(text, True, color)
+        if len(self._label_cache) > _TEXT_CACHE_SIZE:
+            self._label_cache.popitem(last=False)
+        return label
     
     def _draw_animation_path(self, obj_id: str, color: Tuple[int, int, int] = (255, 100, 100)):
         """Отрисовать путь анимации."""
@@ -1053,42 +1699,87 @@ class ScenePreview:
         if len(keyframes) < 2:
             return
         
-        points = []
-        for kf in keyframes:
-            x = int(kf['x'] * self.width)
-            y = int(kf['y'] * self.height)
-            points.append((x, y))
+        points = self._get_path_points(obj_id, keyframes)
         
         # Линия пути
         pygame.draw.lines(self.screen, color, False, points, 2)
         
-        # Точки ключевых кадров
-        for i, point in enumerate(points):
-            point_color = (color[0], max(0, color[1] - 100), max(0, color[2] - 100)) if i == 0 else color
-            pygame.draw.circle(self.screen, point_color, point, 8)
-            pygame.draw.circle(self.screen, (255, 255, 255), point, 8, 2)
+        # Точки ключевых кадров (первая темнее)
+        first_color = (color[0], max(0, color[1] - 100), max(0, color[2] - 100))
+        self._draw_markers(self._get_marker(first_color, 8, (255, 255, 255)), points[:1])
+        self._draw_markers(self._get_marker(color, 8, (255, 255, 255)), points[1:])
+    
+    def _get_marker(self, color: Tuple[int, int, int], radius: int,
+                    ring_color: Optional[Tuple[int, int, int]] = None) -> pygame.Surface:
+        """Кружок маркера (с обводкой толщиной 2, если задан её цвет) - рисуется один раз."""
+        key = (color, radius, ring_color)
+        marker = self._markers.get(key)
+        if marker is None:
+            # draw.circle закрашивает [центр - r, центр + r - 1] - квадрат 2r
+            marker = self._markers[key] = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+            pygame.draw.circle(marker, color, (radius, radius), radius)
+            if ring_color:
+                pygame.draw.circle(marker, ring_color, (radius, radius), radius, 2)
+        return marker
+    
+    def _draw_markers(self, marker: pygame.Surface, centers: List[Tuple[int, int]]):
+        """Нарисовать маркер с центрами в указанных точках."""
+        r = marker.get_width() // 2
+        self.screen.fblits([(marker, (x - r, y - r)) for x, y in centers])
+    
+    def _get_path_points(self, obj_id: str, keyframes: List[Dict]) -> List[Tuple[int, int]]:
+        """Получить точки пути в пикселях, пересчитывая только новые кадры.
+        
+        Списки кадров только пополняются или заменяются целиком.
+        """
+        cached = self._path_points.get(obj_id)
+        if cached is not None and cached[0] is keyframes and cached[1] <= len(keyframes):
+            points = cached[2]
+            new_keyframes = keyframes[cached[1]:]
+        elif HAS_NUMPY:
+            # Весь путь одной векторной операцией
+            xy = np.array([(kf['x'], kf['y']) for kf in keyframes], dtype=np.float64)
+            points = list(map(tuple, (xy * (self.width, self.height)).astype(np.intp).tolist()))
+            new_keyframes = ()
+        else:
+            points = []
+            new_keyframes = keyframes
+        
+        for kf in new_keyframes:
+            points.append((int(kf['x'] * self.width), int(kf['y'] * self.height)))
+        
+        self._path_points[obj_id] = (keyframes, len(keyframes), points)
+        return points
     
     def _draw_ui(self, font: pygame.font.Font):
         """Отрисовать UI."""
         # Полупрозрачная панель сверху
-        ui_surface = pygame.Surface((self.width, 60 if self.is_recording else 40), pygame.SRCALPHA)
-        ui_surface.fill((0, 0, 0, 150))
+        bar_height = 60 if self.is_recording else 40
+        ui_surface = self._ui_bars.get(bar_height)
+        if ui_surface is None:
+            ui_surface = self._ui_bars[bar_height] = pygame.Surface((self.width, bar_height), pygame.SRCALPHA)
+            ui_surface.fill((0, 0, 0, 150))
         self.screen.blit(ui_surface, (0, 0))
         
-        # Подсказки
-        hints = [
-            "preview",
-            f"[G] Сетка: {'ВКЛ' if self.show_grid else 'ВЫКЛ'}",
-            f"[R] Запись: {'●REC' if self.is_recording else 'ВЫКЛ'}",
-            "[K/ПКМ] Кадр"
-        ]
-        
-        x = 10
-        for hint in hints:
-            color = (255, 100, 100) if 'REC' in hint and self.is_recording else (255, 255, 255)
-            text = font.render(hint, True, color)
-            self.screen.blit(text, (x, 10))
-            x += text.get_width() + 20
+        # Подсказки (меняются только с сеткой и записью)
+        state = (self.show_grid, self.is_recording)
+        hint_surfaces = self._ui_hints.get(state)
+        if hint_surfaces is None:
+            hints = [
+                "preview",
+                f"[G] Сетка: {'ВКЛ' if self.show_grid else 'ВЫКЛ'}",
+                f"[R] Запись: {'●REC' if self.is_recording else 'ВЫКЛ'}",
+                "[K/ПКМ] Кадр"
+            ]
+            
+            hint_surfaces = self._ui_hints[state] = []
+            x = 10
+            for hint in hints:
+                color = (255, 100, 100) if 'REC' in hint and self.is_recording else (255, 255, 255)
+                text = font.render(hint, True, color)
+                hint_surfaces.append((text, (x, 10)))
+                x += text.get_width() + 20
+        self.screen.fblits(hint_surfaces)
         
         # Дополнительная информация при записи
         if self.is_recording and self.recording_target:
@@ -1186,8 +1877,8 @@ class GamePreview:
         # Состояние
         self.background: Optional[pygame.Surface] = None
         self.background_color: Optional[Tuple[int, int, int]] = None
-        self.characters: Dict[str, Dict] = {}  # char_id -> {image, x, y, ...}
-        self.images: Dict[str, Dict] = {}  # img_id -> {image, x, y, ...}
+        self.characters: Dict[str, GameSprite] = {}
+        self.images: Dict[str, GameSprite] = {}
         
         # Диалоги
         self.current_dialog_index = 0
@@ -1200,7 +1891,7 @@ class GamePreview:
         self.typing_duration = 0
         
         # Анимации
-        self.animations: Dict[str, Dict] = {}  # char_id -> {keyframes, loop, start_time}
+        self.animations: Dict[str, GameAnimation] = {}  # char_id или img_<id> -> анимация
         
         # Задержка
         self.delay_start = None
@@ -1214,6 +1905,47 @@ class GamePreview:
         # Шрифты
         self.font = None
         self.name_font = None
+        self.hint_font = None
+        self.choice_font = None
+        
+        # Неизменные надписи, рендерятся при запуске окна
+        self._hint_surface: Optional[pygame.Surface] = None
+        self._indicator_surface: Optional[pygame.Surface] = None
+        # Отрендеренные тексты выборов: текст -> Surface
+        self._choice_text_cache: Dict[str, pygame.Surface] = {}
+        # Фоны кнопок выборов (обычная, под курсором) - зависят только от размеров окна
+        self._choice_buttons: Optional[Tuple[pygame.Surface, pygame.Surface]] = None
+        # Разобранные цвета имён персонажей: '#rrggbb' -> (r, g, b)
+        self._name_colors: Dict[str, Tuple[int, int, int]] = {}
+        # Фон диалогового окна и подложка под имя (ширина -> Surface)
+        self._dialog_box_surface: Optional[pygame.Surface] = None
+        self._name_bg_cache: Dict[int, pygame.Surface] = {}
+        
+        # Нужно ли перерисовать кадр (события, команды, анимации)
+        self._dirty = True
+        # Изменилось только диалоговое окно (печать текста)
+        self._dialog_dirty = False
+        
+        # Отрендеренные строки текущей реплики для последнего числа видимых символов
+        self._dialog_lines_text = ""
+        self._dialog_lines_len = -1
+        self._dialog_lines: List[pygame.Surface] = []
+        # Переносы полной реплики: (начало, конец) строк и их отрендеренный вид
+        self._wrap_plan: List[Tuple[int, int]] = []
+        self._wrap_surfaces: Dict[int, pygame.Surface] = {}
+        
+        # Картинки, отсортированные по слою (None - пересортировать)
+        self._images_sorted: Optional[List[Tuple[str, GameSprite]]] = None
+        
+        # Вписанные в окно изображения: (путь, mtime, ширина, высота) -> Surface
+        self._surface_cache: OrderedDict = OrderedDict()
+        # Заранее прочитанные файлы загружаемой сцены: путь -> Surface без convert
+        self._prefetched: Dict[str, pygame.Surface] = {}
+        
+        # Обработчики команд из очереди
+        self._cmd_dispatch: Dict[str, Callable] = {
+            'load_scene': self._cmd_load_scene,
+        }
     
     def start(self):
         """Запустить предпросмотр в отдельном потоке."""
@@ -1231,8 +1963,11 @@ class GamePreview:
         self.animations.clear()
         self.characters.clear()
         self.images.clear()
+        self._images_sorted = None
+        self._surface_cache.clear()  # Surface прошлого запуска недействительны после pygame.quit()
         self.background = None
         self.delay_start = None
+        self._dirty = True
         
         self.running = True
         self.thread = threading.Thread(target=self._run_loop, daemon=True)
@@ -1249,11 +1984,8 @@ class GamePreview:
             self.thread.join(timeout=2.0)
             self.thread = None
         # Очищаем очередь команд
-        while not self.command_queue.empty():
-            try:
-                self.command_queue.get_nowait()
-            except:
-                pass
+        with self.command_queue.mutex:
+            self.command_queue.queue.clear()
     
     def _run_loop(self):
         """Основной цикл pygame."""
@@ -1267,10 +1999,12 @@ class GamePreview:
             
             screen = pygame.display.set_mode((self.width, self.height))
             pygame.display.set_caption("Предпросмотр игры")
+            # Движение мыши и показ окна нужны для перерисовки (подсветка выборов)
+            _allow_events([pygame.QUIT, pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE, pygame.KEYDOWN,
+                           pygame.MOUSEBUTTONDOWN, pygame.MOUSEMOTION])
             
             clock = pygame.time.Clock()
-            self.font = pygame.font.Font(None, 28)
-            self.name_font = pygame.font.Font(None, 32)
+            self._load_fonts()
             
             while self.running:
                 # Обработка команд
@@ -1287,7 +2021,10 @@ class GamePreview:
                             break
                 
                 # События
-                for event in pygame.event.get():
+                events = pygame.event.get()
+                if events:
+                    self._dirty = True
+                for event in events:
                     if event.type == pygame.QUIT:
                         self.running = False
                     elif event.type == pygame.KEYDOWN:
@@ -1306,10 +2043,20 @@ class GamePreview:
                 # Обновление
                 self._update()
                 
-                # Отрисовка
-                self._draw(screen)
-                
-                pygame.display.flip()
+                # Отрисовка только если кадр изменился
+                if self._dirty:
+                    self._dirty = self._dialog_dirty = False
+                    self._draw(screen)
+                    pygame.display.flip()
+                elif self._dialog_dirty:
+                    # Во время печати перерисовывается только область диалогового окна
+                    self._dialog_dirty = False
+                    if not self.show_choices:
+                        dialog_rect = self._dialog_box_rect()
+                        screen.set_clip(dialog_rect)
+                        self._draw(screen)
+                        screen.set_clip(None)
+                        pygame.display.update(dialog_rect)
                 clock.tick(60)
         
         finally:
@@ -1324,159 +2071,105 @@ class GamePreview:
                 pass
             self.running = False
     
+    def _load_fonts(self):
+        """Создать шрифты и неизменные надписи (после pygame.init)."""
+        self.font = pygame.font.Font(None, 28)
+        self.name_font = pygame.font.Font(None, 32)
+        self.hint_font = pygame.font.Font(None, 20)
+        self.choice_font = pygame.font.Font(None, 32)
+        self._hint_surface = self.hint_font.render("Пробел/Клик - далее | ESC - закрыть", True, (180, 180, 180))
+        self._indicator_surface = self.font.render("▼", True, (200, 200, 200))
+        self._choice_text_cache.clear()
+    
     def _process_commands(self):
-        """Обработать команды из очереди."""
-        while not self.command_queue.empty():
-            try:
-                cmd, data = self.command_queue.get_nowait()
-                
-                if cmd == 'load_scene':
-                    self._cmd_load_scene(data)
-                elif cmd == 'set_background':
-                    self._cmd_set_background(data)
-                
-            except queue.Empty:
-                break
+        """Обработать команды из очереди (всю очередь за один захват блокировки)."""
+        with self.command_queue.mutex:
+            items = list(self.command_queue.queue)
+            self.command_queue.queue.clear()
+        if not items:
+            return
+        
+        self._dirty = True
+        for cmd, data in items:
+            handler = self._cmd_dispatch.get(cmd)
+            if handler:
+                handler(data)
     
     def _cmd_load_scene(self, data):
         """Загрузить сцену."""
         self.scene, self.story, self.characters_data = data
+        self._internal_load_scene(self.scene)
+    
+    def _prefetch_scene_images(self):
+        """Параллельно прочитать фон и ещё не закэшированные изображения сцены.
         
-        # Сбрасываем состояние
-        self.current_dialog_index = 0
-        self.characters.clear()
-        self.images.clear()
-        self.animations.clear()
-        self.show_choices = False
-        self.choice_rects.clear()
-        
-        if not self.scene:
-            return
-        
-        # Фон
-        if self.scene.background and os.path.exists(self.scene.background):
-            try:
-                bg = pygame.image.load(self.scene.background).convert()
-                self.background = pygame.transform.smoothscale(bg, (self.width, self.height))
-            except:
-                self.background = None
-        else:
-            self.background = None
-        
-        self.background_color = self.scene.background_color
+        pygame декодирует файлы с отпущенным GIL, поэтому потоки работают
+        одновременно. convert/convert_alpha требуют окна и выполняются потом,
+        в потоке предпросмотра.
+        """
+        self._prefetched.clear()
+        paths = [self.scene.background]
+        for char_data in self.scene.characters_on_screen:
+            character = self.characters_data.get(char_data.get('id'))
+            if character:
+                emotion = char_data.get('emotion', 'default')
+                paths.append(character.images.get(emotion, character.images.get('default', '')))
+        paths.extend(img_data.get('path', '') for img_data in self.scene.images_on_screen)
         
-        # Музыка
-        if self.scene.music and os.path.exists(self.scene.music):
+        todo = []
+        for path in dict.fromkeys(p for p in paths if p):
             try:
-                pygame.mixer.music.load(self.scene.music)
-                pygame.mixer.music.play(-1)  # Зацикленное воспроизведение
-            except:
-                pass
-        
-        # Персонажи на сцене
-        for char_data in self.scene.characters_on_screen:
-            char_id = char_data.get('id')
-            character = self.characters_data.get(char_id)
-            if not character:
+                key = (os.path.abspath(path), os.path.getmtime(path), self.width, self.height)
+            except OSError:
                 continue
-            
-            emotion = char_data.get('emotion', 'default')
-            image_path = character.images.get(emotion, character.images.get('default', ''))
-            
-            char_info = {
-                'x': char_data.get('x', 0.5),
-                'y': char_data.get('y', 0.7),
-                'scale': char_data.get('scale', 1.0),
-                'rotation': char_data.get('rotation', 0),
-                'flip_x': char_data.get('flip_x', False),
-                'flip_y': char_data.get('flip_y', False),
-                'alpha': 255,
-                'image': None,
-                'original_image': None
-            }
-            
-            if image_path and os.path.exists(image_path):
-                try:
-                    img = pygame.image.load(image_path).convert_alpha()
-                    # Масштабируем
-                    scale_h = self.height * 0.8 / max(img.get_height(), 1)
-                    scale_w = self.width * 0.8 / max(img.get_width(), 1)
-                    base_scale = min(scale_h, scale_w, 1.0)
-                    if base_scale < 1.0:
-                        new_w = int(img.get_width() * base_scale)
-                        new_h = int(img.get_height() * base_scale)
-                        if new_w > 0 and new_h > 0:
-                            img = pygame.transform.smoothscale(img, (new_w, new_h))
-                    char_info['original_image'] = img
-                    char_info['image'] = img
-                except:
-                    pass
-            
-            self.characters[char_id] = char_info
-        
-        # Картинки на сцене
-        for img_data in self.scene.images_on_screen:
-            img_id = img_data.get('id')
-            img_path = img_data.get('path', '')
-            
-            img_info = {
-                'x': img_data.get('x', 0.5),
-                'y': img_data.get('y', 0.5),
-                'scale': img_data.get('scale', 1.0),
-                'layer': img_data.get('layer', 0),
-                'image': None
-            }
-            
-            if img_path and os.path.exists(img_path):
-                try:
-                    img = pygame.image.load(img_path).convert_alpha()
-                    scale_h = self.height * 0.8 / max(img.get_height(), 1)
-                    scale_w = self.width * 0.8 / max(img.get_width(), 1)
-                    base_scale = min(scale_h, scale_w, 1.0)
-                    if base_scale < 1.0:
-                        new_w = int(img.get_width() * base_scale)
-                        new_h = int(img.get_height() * base_scale)
-                        if new_w > 0 and new_h > 0:
-                            img = pygame.transform.smoothscale(img, (new_w, new_h))
-                    img_info['image'] = img
-                except:
-                    pass
-            
-            self.images[img_id] = img_info
-        
-        # Запуск фоновых анимаций сцены
-        if hasattr(self.scene, 'background_animations') and self.scene.background_animations:
-            self._start_background_animations(self.scene.background_animations)
+            if key not in self._surface_cache:
+                todo.append(path)
+        if len(todo) < 2:
+            return
         
-        # Показываем первый диалог
-        self._show_dialog(0)
-    
-    def _start_background_animations(self, animations: List[Dict]):
-        """Запустить фоновые анимации сцены."""
-        current_time = pygame.time.get_ticks()
+        with ThreadPoolExecutor(max_workers=min(_LOADER_THREADS, len(todo))) as pool:
+            for path, raw in zip(todo, pool.map(_load_raw_image, todo)):
+                if raw is not None:
+                    self._prefetched[path] = raw
+    
+    def _load_and_fit(self, path: str) -> Tuple[pygame.Surface, bool]:
+        """Загрузить изображение, уменьшенное до 80% окна.
+        
+        Возвращает (изображение, полностью ли оно непрозрачно). Результат
+        кэшируется по пути и времени изменения файла, поэтому повторные
+        сцены и смена эмоций не читают диск заново, а правка картинки
+        подхватывается при следующей загрузке.
+        """
+        key = (os.path.abspath(path), os.path.getmtime(path), self.width, self.height)
+        cache = self._surface_cache
+        entry = cache.get(key)
+        if entry is not None:
+            cache.move_to_end(key)
+            return entry
+        
+        img = self._prefetched.pop(path, None)
+        if img is None:
+            img = pygame.image.load(path)
+        img = img.convert_alpha()
+        scale_h = self.height * 0.8 / max(img.get_height(), 1)
+        scale_w = self.width * 0.8 / max(img.get_width(), 1)
+        base_scale = min(scale_h, scale_w, 1.0)
+        if base_scale < 1.0:
+            new_w = int(img.get_width() * base_scale)
+            new_h = int(img.get_height() * base_scale)
+            if new_w > 0 and new_h > 0:
+                img = pygame.transform.smoothscale(img, (new_w, new_h))
         
-        for anim in animations:
-            char_id = anim.get('character_id')
-            image_id = anim.get('image_id')
-            keyframes = anim.get('keyframes', [])
-            loop = anim.get('loop', False)
-            
-            if keyframes:
-                if char_id:
-                    self.animations[char_id] = {
-                        'keyframes': keyframes,
-                        'loop': loop,
-                        'start_time': current_time
-                    }
-                elif image_id:
-                    self.animations[f"img_{image_id}"] = {
-                        'keyframes': keyframes,
-                        'loop': loop,
-                        'start_time': current_time
-                    }
+        w, h = img.get_size()
+        entry = (img, pygame.mask.from_surface(img, 254).count() == w * h)
+        cache[key] = entry
+        if len(cache) > _SURFACE_CACHE_SIZE:
+            cache.popitem(last=False)
+        return entry
     
     def _show_dialog(self, index: int):
         """Показать диалог."""
+        self._dirty = True
         if not self.scene or index >= len(self.scene.dialogs):
             # Конец диалогов - проверяем выборы
             if self.scene and self.scene.choices:
@@ -1516,40 +2209,29 @@ class GamePreview:
             character = self.characters_data.get(dialog.character_id)
             if character:
                 self.dialog_name = character.name
-                # Парсинг цвета
-                color = character.color
-                if isinstance(color, str) and color.startswith('#'):
-                    hex_color = color.lstrip('#')
-                    if len(hex_color) == 6:
-                        self.dialog_name_color = tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+                self.dialog_name_color = self._get_name_color(character.color)
                 
                 # Обновляем эмоцию персонажа
                 if dialog.character_id in self.characters:
                     emotion = dialog.emotion or 'default'
                     image_path = character.images.get(emotion, character.images.get('default', ''))
-                    if image_path and os.path.exists(image_path):
+                    if image_path:
                         try:
-                            img = pygame.image.load(image_path).convert_alpha()
-                            scale_h = self.height * 0.8 / max(img.get_height(), 1)
-                            scale_w = self.width * 0.8 / max(img.get_width(), 1)
-                            base_scale = min(scale_h, scale_w, 1.0)
-                            if base_scale < 1.0:
-                                new_w = int(img.get_width() * base_scale)
-                                new_h = int(img.get_height() * base_scale)
-                                if new_w > 0 and new_h > 0:
-                                    img = pygame.transform.smoothscale(img, (new_w, new_h))
-                            self.characters[dialog.character_id]['original_image'] = img
-                            self.characters[dialog.character_id]['image'] = img
+                            img, opaque = self._load_and_fit(image_path)
+                            sprite = self.characters[dialog.character_id]
+                            sprite.original_image = img
+                            sprite.opaque = opaque
+                            sprite.image = img
                         except:
                             pass
                 
                 # Позиция из диалога
                 if dialog.position and dialog.character_id in self.characters:
                     char = self.characters[dialog.character_id]
-                    char['x'] = dialog.position.get('x', char['x'])
-                    char['y'] = dialog.position.get('y', char['y'])
-                    char['scale'] = dialog.position.get('scale', char.get('scale', 1.0))
-                    char['rotation'] = dialog.position.get('rotation', char.get('rotation', 0))
+                    char.x = dialog.position.get('x', char.x)
+                    char.y = dialog.position.get('y', char.y)
+                    char.scale = dialog.position.get('scale', char.scale)
+                    char.rotation = dialog.position.get('rotation', char.rotation)
         
         # Текст
         if dialog.is_delay_only:
@@ -1574,9 +2256,15 @@ class GamePreview:
         if dialog.animations:
             self._start_animations(dialog.animations)
     
-    def _start_animations(self, animations: List[Dict]):
-        """Запустить анимации."""
-        self.animations.clear()
+    def _start_animations(self, animations: List[Dict], background: bool = False):
+        """Запустить анимации реплики или фоновые анимации сцены.
+        
+        Анимации новой реплики заменяют анимации прошлой, а фоновые
+        продолжаются, пока тот же объект не получит свою анимацию.
+        """
+        if not background:
+            self.animations = {anim_id: anim for anim_id, anim in self.animations.items()
+                               if anim.background}
         current_time = pygame.time.get_ticks()
         
         for anim in animations:
@@ -1587,18 +2275,10 @@ class GamePreview:
             
             if keyframes:
                 if char_id:
-                    self.animations[char_id] = {
-                        'keyframes': keyframes,
-                        'loop': loop,
-                        'start_time': current_time
-                    }
+                    self.animations[char_id] = GameAnimation(keyframes, loop, current_time, background)
                 elif image_id:
                     # Анимация картинки - добавляем с префиксом img_
-                    self.animations[f"img_{image_id}"] = {
-                        'keyframes': keyframes,
-                        'loop': loop,
-                        'start_time': current_time
-                    }
+                    self.animations[f"img_{image_id}"] = GameAnimation(keyframes, loop, current_time, background)
     
     def _next_dialog(self):
         """Перейти к следующему диалогу."""
@@ -1652,6 +2332,7 @@ class GamePreview:
         self.current_dialog_index = 0
         self.characters.clear()
         self.images.clear()
+        self._images_sorted = None
         self.animations.clear()
         self.show_choices = False
         self.choice_rects.clear()
@@ -1659,10 +2340,15 @@ class GamePreview:
         if not self.scene:
             return
         
+        self._prefetch_scene_images()
+        
         # Фон
-        if self.scene.background and os.path.exists(self.scene.background):
+        if self.scene.background:
             try:
-                bg = pygame.image.load(self.scene.background).convert()
+                bg = self._prefetched.pop(self.scene.background, None)
+                if bg is None:
+                    bg = pygame.image.load(self.scene.background)
+                bg = bg.convert()
                 self.background = pygame.transform.smoothscale(bg, (self.width, self.height))
             except:
                 self.background = None
@@ -1672,10 +2358,10 @@ class GamePreview:
         self.background_color = self.scene.background_color
         
         # Музыка
-        if self.scene.music and os.path.exists(self.scene.music):
+        if self.scene.music:
             try:
                 pygame.mixer.music.load(self.scene.music)
-                pygame.mixer.music.play(-1)
+                pygame.mixer.music.play(-1)  # Зацикленное воспроизведение
             except:
                 pass
         
@@ -1689,31 +2375,20 @@ class GamePreview:
             emotion = char_data.get('emotion', 'default')
             image_path = character.images.get(emotion, character.images.get('default', ''))
             
-            char_info = {
-                'x': char_data.get('x', 0.5),
-                'y': char_data.get('y', 0.7),
-                'scale': char_data.get('scale', 1.0),
-                'rotation': char_data.get('rotation', 0),
-                'flip_x': char_data.get('flip_x', False),
-                'flip_y': char_data.get('flip_y', False),
-                'alpha': 255,
-                'image': None,
-                'original_image': None
-            }
+            char_info = GameSprite(
+                x=char_data.get('x', 0.5),
+                y=char_data.get('y', 0.7),
+                scale=char_data.get('scale', 1.0),
+                rotation=char_data.get('rotation', 0),
+                flip_x=char_data.get('flip_x', False),
+                flip_y=char_data.get('flip_y', False),
+            )
             
-            if image_path and os.path.exists(image_path):
+            if image_path:
                 try:
-                    img = pygame.image.load(image_path).convert_alpha()
-                    scale_h = self.height * 0.8 / max(img.get_height(), 1)
-                    scale_w = self.width * 0.8 / max(img.get_width(), 1)
-                    base_scale = min(scale_h, scale_w, 1.0)
-                    if base_scale < 1.0:
-                        new_w = int(img.get_width() * base_scale)
-                        new_h = int(img.get_height() * base_scale)
-                        if new_w > 0 and new_h > 0:
-                            img = pygame.transform.smoothscale(img, (new_w, new_h))
-                    char_info['original_image'] = img
-                    char_info['image'] = img
+                    img, char_info.opaque = self._load_and_fit(image_path)
+                    char_info.original_image = img
+                    char_info.image = img
                 except:
                     pass
             
@@ -1724,44 +2399,47 @@ class GamePreview:
             img_id = img_data.get('id')
             img_path = img_data.get('path', '')
             
-            img_info = {
-                'x': img_data.get('x', 0.5),
-                'y': img_data.get('y', 0.5),
-                'scale': img_data.get('scale', 1.0),
-                'rotation': img_data.get('rotation', 0.0),
-                'layer': img_data.get('layer', 0),
-                'image': None,
-                'original_image': None
-            }
+            img_info = GameSprite(
+                x=img_data.get('x', 0.5),
+                y=img_data.get('y', 0.5),
+                scale=img_data.get('scale', 1.0),
+                rotation=img_data.get('rotation', 0.0),
+                layer=img_data.get('layer', 0),
+            )
             
-            if img_path and os.path.exists(img_path):
+            if img_path:
                 try:
-                    img = pygame.image.load(img_path).convert_alpha()
-                    # Базовое масштабирование под размер экрана
-                    scale_h = self.height * 0.8 / max(img.get_height(), 1)
-                    scale_w = self.width * 0.8 / max(img.get_width(), 1)
-                    base_scale = min(scale_h, scale_w, 1.0)
-                    if base_scale < 1.0:
-                        new_w = int(img.get_width() * base_scale)
-                        new_h = int(img.get_height() * base_scale)
-                        if new_w > 0 and new_h > 0:
-                            img = pygame.transform.smoothscale(img, (new_w, new_h))
-                    img_info['original_image'] = img
-                    img_info['image'] = img
+                    img, img_info.opaque = self._load_and_fit(img_path)
+                    img_info.original_image = img
+                    img_info.image = img
                 except:
                     pass
             
             self.images[img_id] = img_info
         
+        # Запуск фоновых анимаций сцены
+        if hasattr(self.scene, 'background_animations') and self.scene.background_animations:
+            self._start_animations(self.scene.background_animations, background=True)
+        
         # Показываем первый диалог
         self._show_dialog(0)
     
     def _update(self):
         """Обновить состояние."""
+        # Нет печати, задержки и анимаций - обновлять нечего
+        if (not self.animations and self.delay_start is None
+                and (self.typing_progress >= 1.0 or self.typing_duration <= 0)):
+            return
+        
         current_time = pygame.time.get_ticks()
         
+        # Анимации меняют весь кадр, печать текста - только диалоговое окно
+        if self.animations:
+            self._dirty = True
+        
         # Эффект печати
         if self.typing_progress < 1.0 and self.typing_duration > 0:
+            self._dialog_dirty = True
             elapsed = current_time - self.typing_start_time
             self.typing_progress = min(elapsed / self.typing_duration, 1.0)
         
@@ -1775,68 +2453,85 @@ class GamePreview:
                         self._show_dialog(self.current_dialog_index + 1)
         
         # Обновление анимаций персонажей и картинок
-        for anim_id, anim_data in list(self.animations.items()):
-            elapsed = (current_time - anim_data['start_time']) / 1000.0
-            keyframes = anim_data['keyframes']
-            loop = anim_data['loop']
+        finished = None
+        for anim_id, anim_data in self.animations.items():
+            elapsed = (current_time - anim_data.start_time) / 1000.0
+            times = anim_data.times
+            values = anim_data.values
             
-            if not keyframes:
+            if not times:
                 continue
-            
-            total_duration = keyframes[-1]['time']
+            total_duration = times[-1]
             
             # Зацикливание
-            if loop and total_duration > 0:
+            if anim_data.loop and total_duration > 0:
                 elapsed = elapsed % total_duration
             elif elapsed > total_duration:
-                # Анимация закончилась
-                del self.animations[anim_id]
+                # Анимация закончилась - удаляется после обхода
+                if finished is None:
+                    finished = []
+                finished.append(anim_id)
                 continue
             
-            # Интерполяция
-            prev_kf = keyframes[0]
-            next_kf = keyframes[-1]
-            
-            for i, kf in enumerate(keyframes):
-                if kf['time'] <= elapsed:
-                    prev_kf = kf
-                    if i + 1 < len(keyframes):
-                        next_kf = keyframes[i + 1]
-                else:
-                    next_kf = kf
-                    break
+            # Интерполяция: кадры между prev и next
+            segment = self._find_segment(times, elapsed, anim_data.segment)
+            anim_data.segment = segment
+            if segment == 0:
+                prev_i = next_i = 0
+            elif segment == len(times):
+                prev_i = next_i = segment - 1
+            else:
+                prev_i, next_i = segment - 1, segment
             
-            if prev_kf['time'] == next_kf['time']:
+            if times[prev_i] == times[next_i]:
                 t = 0
             else:
-                t = (elapsed - prev_kf['time']) / (next_kf['time'] - prev_kf['time'])
+                t = (elapsed - times[prev_i]) / (times[next_i] - times[prev_i])
                 t = max(0, min(1, t))
             
             # Применяем к персонажу или картинке
-            x = prev_kf.get('x', 0.5) + (next_kf.get('x', 0.5) - prev_kf.get('x', 0.5)) * t
-            y = prev_kf.get('y', 0.7) + (next_kf.get('y', 0.7) - prev_kf.get('y', 0.7)) * t
-            scale = prev_kf.get('scale', 1.0) + (next_kf.get('scale', 1.0) - prev_kf.get('scale', 1.0)) * t
-            rotation = prev_kf.get('rotation', 0) + (next_kf.get('rotation', 0) - prev_kf.get('rotation', 0)) * t
-            alpha = int((prev_kf.get('alpha', 1.0) + (next_kf.get('alpha', 1.0) - prev_kf.get('alpha', 1.0)) * t) * 255)
+            prev_v = values[prev_i]
+            next_v = values[next_i]
+            x = prev_v[0] + (next_v[0] - prev_v[0]) * t
+            y = prev_v[1] + (next_v[1] - prev_v[1]) * t
+            scale = prev_v[2] + (next_v[2] - prev_v[2]) * t
+            rotation = prev_v[3] + (next_v[3] - prev_v[3]) * t
+            alpha = int((prev_v[4] + (next_v[4] - prev_v[4]) * t) * 255)
             
             # Проверяем, это анимация картинки или персонажа
             if anim_id.startswith('img_'):
                 img_id = anim_id[4:]  # Убираем префикс "img_"
                 if img_id in self.images:
                     img = self.images[img_id]
-                    img['x'] = x
-                    img['y'] = y
-                    img['scale'] = scale
-                    img['rotation'] = rotation
-                    img['alpha'] = alpha
+                    img.x = x
+                    img.y = y
+                    img.scale = scale
+                    img.rotation = rotation
+                    img.alpha = alpha
             else:
                 if anim_id in self.characters:
                     char = self.characters[anim_id]
-                    char['x'] = x
-                    char['y'] = y
-                    char['scale'] = scale
-                    char['rotation'] = rotation
-                    char['alpha'] = alpha
+                    char.x = x
+                    char.y = y
+                    char.scale = scale
+                    char.rotation = rotation
+                    char.alpha = alpha
+        
+        if finished:
+            for anim_id in finished:
+                del self.animations[anim_id]
+    
+    @staticmethod
+    def _find_segment(times: List[float], elapsed: float, hint: int) -> int:
+        """Индекс первого кадра со временем больше elapsed (len(times), если таких нет).
+        
+        Кадры отсортированы по времени. Обычно elapsed остаётся в отрезке
+        прошлого кадра, иначе отрезок ищется двоичным поиском.
+        """
+        if (hint <= len(times) and (hint == 0 or times[hint - 1] <= elapsed)
+                and (hint == len(times) or times[hint] > elapsed)):
+            return hint
+        return bisect_right(times, elapsed)
     
     def _draw(self, screen: pygame.Surface):
         """Отрисовка."""
@@ -1849,64 +2544,26 @@ class GamePreview:
             screen.fill((30, 30, 40))
         
         # Картинки (по слоям)
-        sorted_images = sorted(self.images.items(), key=lambda x: x[1].get('layer', 0))
+        if self._images_sorted is None:
+            self._images_sorted = sorted(self.images.items(), key=lambda x: x[1].layer)
+        sorted_images = self._images_sorted
         for img_id, img_data in sorted_images:
-            img = img_data.get('original_image')
+            img = self._get_sprite_surface(img_data)
             if not img:
                 continue
             
-            # Применяем масштаб
-            scale = img_data.get('scale', 1.0)
-            if scale != 1.0:
-                new_w = int(img.get_width() * scale)
-                new_h = int(img.get_height() * scale)
-                if new_w > 0 and new_h > 0:
-                    img = pygame.transform.smoothscale(img, (new_w, new_h))
-            
-            # Поворот
-            rotation = img_data.get('rotation', 0.0)
-            if rotation != 0:
-                img = pygame.transform.rotate(img, rotation)
-            
-            # Альфа
-            alpha = img_data.get('alpha', 255)
-            if alpha < 255:
-                img = img.copy()
-                img.set_alpha(alpha)
-            
-            x = int(img_data['x'] * self.width - img.get_width() / 2)
-            y = int(img_data['y'] * self.height - img.get_height() / 2)
+            x = int(img_data.x * self.width - img.get_width() / 2)
+            y = int(img_data.y * self.height - img.get_height() / 2)
             screen.blit(img, (x, y))
         
         # Персонажи
         for char_id, char_data in self.characters.items():
-            img = char_data.get('original_image')
+            img = self._get_sprite_surface(char_data)
             if not img:
                 continue
             
-            # Применяем трансформации
-            scale = char_data.get('scale', 1.0)
-            rotation = char_data.get('rotation', 0)
-            alpha = char_data.get('alpha', 255)
-            
-            # Масштаб
-            if scale != 1.0:
-                new_w = int(img.get_width() * scale)
-                new_h = int(img.get_height() * scale)
-                if new_w > 0 and new_h > 0:
-                    img = pygame.transform.smoothscale(img, (new_w, new_h))
-            
-            # Поворот
-            if rotation != 0:
-                img = pygame.transform.rotate(img, rotation)
-            
-            # Альфа
-            if alpha < 255:
-                img = img.copy()
-                img.set_alpha(alpha)
-            
-            x = int(char_data['x'] * self.width - img.get_width() / 2)
-            y = int(char_data['y'] * self.height - img.get_height() / 2)
+            x = int(char_data.x * self.width - img.get_width() / 2)
+            y = int(char_data.y * self.height - img.get_height() / 2)
             screen.blit(img, (x, y))
         
         # Диалоговое окно или выборы
@@ -1916,50 +2573,121 @@ class GamePreview:
             self._draw_dialog_box(screen)
         
         # Подсказка
-        hint_font = pygame.font.Font(None, 20)
-        hint = hint_font.render("Пробел/Клик - далее | ESC - закрыть", True, (180, 180, 180))
-        screen.blit(hint, (10, 10))
+        screen.blit(self._hint_surface, (10, 10))
+    
+    def _get_sprite_surface(self, data: GameSprite) -> Optional[pygame.Surface]:
+        """Получить изображение персонажа/картинки с масштабом, поворотом и прозрачностью.
+        
+        Результат хранится в data.transformed и пересчитывается только
+        при смене исходного изображения или параметров.
+        """
+        img = data.original_image
+        if not img:
+            return None
+        
+        scale = data.scale
+        rotation = data.rotation
+        alpha = data.alpha
+        key = (scale, rotation, alpha)
+        
+        cached = data.transformed
+        if cached is not None and cached[0] is img and cached[1] == key:
+            return cached[2]
+        
+        result = img
+        # Масштаб, который даёт пустое изображение, не применяется
+        if scale != 1.0:
+            new_w = int(img.get_width() * scale)
+            new_h = int(img.get_height() * scale)
+            if new_w <= 0 or new_h <= 0:
+                scale = 1.0
+        
+        if rotation != 0:
+            # Масштаб и поворот за один проход, без промежуточной поверхности
+            result = pygame.transform.rotozoom(img, rotation, scale)
+        elif scale != 1.0:
+            result = pygame.transform.smoothscale(img, (new_w, new_h))
+        
+        # Альфа
+        if alpha < 255:
+            if result is img:
+                result = result.copy()
+            result.set_alpha(alpha)
+        elif rotation == 0 and data.opaque:
+            # Непрозрачное изображение рисуется обычным копированием, без
+            # попиксельного смешивания (после поворота углы всегда прозрачны)
+            result = result.convert()
+        
+        data.transformed = (img, key, result)
+        return result
     
     def _draw_choices(self, screen: pygame.Surface):
         """Отрисовка меню выборов."""
         if not self.scene or not self.scene.choices:
             return
         
-        self.choice_rects.clear()
-        
-        choice_font = pygame.font.Font(None, 32)
         choice_height = 50
         choice_spacing = 10
-        total_height = len(self.scene.choices) * (choice_height + choice_spacing)
-        start_y = (self.height - total_height) // 2
         choice_width = min(600, self.width - 100)
-        start_x = (self.width - choice_width) // 2
         
-        for i, choice in enumerate(self.scene.choices):
-            y = start_y + i * (choice_height + choice_spacing)
-            rect = pygame.Rect(start_x, y, choice_width, choice_height)
-            self.choice_rects.append(rect)
-            
-            # Цвет фона
-            if i == self.hovered_choice:
-                bg_color = (80, 80, 120, 230)
-                border_color = (150, 150, 200)
-            else:
-                bg_color = (40, 40, 60, 200)
-                border_color = (100, 100, 140)
-            
-            # Рисуем кнопку
-            button_surface = pygame.Surface((choice_width, choice_height), pygame.SRCALPHA)
-            pygame.draw.rect(button_surface, bg_color, (0, 0, choice_width, choice_height), border_radius=8)
-            pygame.draw.rect(button_surface, border_color, (0, 0, choice_width, choice_height), width=2, border_radius=8)
-            screen.blit(button_surface, (start_x, y))
+        # Положение кнопок зависит только от их количества
+        if len(self.choice_rects) != len(self.scene.choices):
+            total_height = len(self.scene.choices) * (choice_height + choice_spacing)
+            start_y = (self.height - total_height) // 2
+            start_x = (self.width - choice_width) // 2
+            self.choice_rects[:] = [
+                pygame.Rect(start_x, start_y + i * (choice_height + choice_spacing), choice_width, choice_height)
+                for i in range(len(self.scene.choices))
+            ]
+        
+        if self._choice_buttons is None:
+            self._choice_buttons = (
+                self._build_choice_button(choice_width, choice_height, (40, 40, 60, 200), (100, 100, 140)),
+                self._build_choice_button(choice_width, choice_height, (80, 80, 120, 230), (150, 150, 200)),
+            )
+        normal_button, hover_button = self._choice_buttons
+        
+        for i, (choice, rect) in enumerate(zip(self.scene.choices, self.choice_rects)):
+            screen.blit(hover_button if i == self.hovered_choice else normal_button, rect.topleft)
             
             # Текст
-            text_surface = choice_font.render(choice.text, True, (255, 255, 255))
-            text_x = start_x + (choice_width - text_surface.get_width()) // 2
-            text_y = y + (choice_height - text_surface.get_height()) // 2
+            text_surface = self._choice_text_cache.get(choice.text)
+            if text_surface is None:
+                text_surface = self.choice_font.render(choice.text, True, (255, 255, 255))
+                self._choice_text_cache[choice.text] = text_surface
+            text_x = rect.x + (choice_width - text_surface.get_width()) // 2
+            text_y = rect.y + (choice_height - text_surface.get_height()) // 2
             screen.blit(text_surface, (text_x, text_y))
     
+    @staticmethod
+    def _build_choice_button(width: int, height: int, bg_color: Tuple[int, int, int, int],
+                             border_color: Tuple[int, int, int]) -> pygame.Surface:
+        """Нарисовать фон кнопки выбора со скруглённой рамкой."""
+        button_surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        pygame.draw.rect(button_surface, bg_color, (0, 0, width, height), border_radius=8)
+        pygame.draw.rect(button_surface, border_color, (0, 0, width, height), width=2, border_radius=8)
+        return button_surface
+    
+    def _get_name_color(self, color) -> Tuple[int, int, int]:
+        """Цвет имени персонажа из строки '#rrggbb' (разбирается один раз)."""
+        if not isinstance(color, str):
+            return (255, 255, 255)
+        rgb = self._name_colors.get(color)
+        if rgb is None:
+            rgb = (255, 255, 255)
+            if color.startswith('#'):
+                hex_color = color.lstrip('#')
+                if len(hex_color) == 6:
+                    rgb = tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+            self._name_colors[color] = rgb
+        return rgb
+    
+    def _dialog_box_rect(self) -> pygame.Rect:
+        """Область диалогового окна вместе с подложкой имени."""
+        box_height = 150
+        box_y = self.height - box_height - 20
+        return pygame.Rect(40, box_y - 20, self.width - 80, box_height + 20)
+    
     def _draw_dialog_box(self, screen: pygame.Surface):
         """Отрисовка диалогового окна."""
         if not self.dialog_text and not self.dialog_name:
@@ -1971,57 +2699,98 @@ class GamePreview:
         box_x = 40
         box_width = self.width - 80
         
-        # Фон
-        box_surface = pygame.Surface((box_width, box_height), pygame.SRCALPHA)
-        pygame.draw.rect(box_surface, (20, 20, 35, 220), (0, 0, box_width, box_height), border_radius=10)
-        pygame.draw.rect(box_surface, (100, 100, 140, 180), (0, 0, box_width, box_height), width=2, border_radius=10)
+        # Фон (размеры окна не меняются - рисуется один раз)
+        box_surface = self._dialog_box_surface
+        if box_surface is None:
+            box_surface = pygame.Surface((box_width, box_height), pygame.SRCALPHA)
+            pygame.draw.rect(box_surface, (20, 20, 35, 220), (0, 0, box_width, box_height), border_radius=10)
+            pygame.draw.rect(box_surface, (100, 100, 140, 180), (0, 0, box_width, box_height), width=2, border_radius=10)
+            self._dialog_box_surface = box_surface
         screen.blit(box_surface, (box_x, box_y))
         
         # Имя персонажа
         if self.dialog_name:
             name_surface = self.name_font.render(self.dialog_name, True, self.dialog_name_color)
-            # Фон под именем
-            name_bg = pygame.Surface((name_surface.get_width() + 20, 30), pygame.SRCALPHA)
-            pygame.draw.rect(name_bg, (40, 40, 60, 200), (0, 0, name_bg.get_width(), 30), border_radius=5)
+            # Фон под именем зависит только от ширины имени
+            name_bg_width = name_surface.get_width() + 20
+            name_bg = self._name_bg_cache.get(name_bg_width)
+            if name_bg is None:
+                name_bg = pygame.Surface((name_bg_width, 30), pygame.SRCALPHA)
+                pygame.draw.rect(name_bg, (40, 40, 60, 200), (0, 0, name_bg_width, 30), border_radius=5)
+                self._name_bg_cache[name_bg_width] = name_bg
             screen.blit(name_bg, (box_x + 15, box_y - 20))
             screen.blit(name_surface, (box_x + 25, box_y - 15))
         
         # Текст с эффектом печати
         if self.dialog_text:
             visible_len = int(len(self.dialog_text) * self.typing_progress)
-            visible_text = self.dialog_text[:visible_len]
-            
-            # Разбиваем на строки
-            words = visible_text.split(' ')
-            lines = []
-            current_line = ""
-            max_width = box_width - 40
-            
-            for word in words:
-                test_line = current_line + (" " if current_line else "") + word
-                test_surface = self.font.render(test_line, True, (255, 255, 255))
-                if test_surface.get_width() > max_width:
-                    if current_line:
-                        lines.append(current_line)
-                    current_line = word
-                else:
-                    current_line = test_line
-            if current_line:
-                lines.append(current_line)
             
             # Рисуем строки
             y_offset = box_y + 20
-            for line in lines[:4]:  # Максимум 4 строки
-                lines.append(current_line)
-                text_surface = self.font.render(line, True, (255, 255, 255))
+            for text_surface in self._get_dialog_lines(visible_len, box_width - 40):
                 screen.blit(text_surface, (box_x + 20, y_offset))
                 y_offset += 30
         
         # Индикатор продолжения
         if self.typing_progress >= 1.0:
-            indicator = "▼"
-            ind_surface = self.font.render(indicator, True, (200, 200, 200))
-            screen.blit(ind_surface, (box_x + box_width - 30, box_y + box_height - 30))
+            screen.blit(self._indicator_surface, (box_x + box_width - 30, box_y + box_height - 30))
+    
+    def _get_dialog_lines(self, visible_len: int, max_width: int) -> List[pygame.Surface]:
+        """Получить отрендеренные строки видимой части реплики (не больше 4).
+        
+        Переносы считаются один раз для всей реплики, поэтому слово при печати
+        сразу появляется на своей строке. На каждый новый видимый символ
+        рендерится только последняя, недописанная строка.
+        """
+        text = self.dialog_text
+        if self._dialog_lines_text != text:
+            self._dialog_lines_text = text
+            self._dialog_lines_len = -1
+            self._wrap_plan = self._wrap_text(text, max_width)
+            self._wrap_surfaces.clear()
+        
+        if visible_len == self._dialog_lines_len:
+            return self._dialog_lines
+        
+        surfaces = []
+        for i, (start, end) in enumerate(self._wrap_plan[:4]):  # Максимум 4 строки
+            if start >= visible_len:
+                break
+            if end <= visible_len:
+                # Строка видна целиком - рендерится один раз на реплику
+                surface = self._wrap_surfaces.get(i)
+                if surface is None:
+                    surface = self._wrap_surfaces[i] = self.font.render(text[start:end], True, (255, 255, 255))
+            else:
+                surface = self.font.render(text[start:visible_len], True, (255, 255, 255))
+            surfaces.append(surface)
+        
+        self._dialog_lines_len = visible_len
+        self._dialog_lines = surfaces
+        return surfaces
+    
+    def _wrap_text(self, text: str, max_width: int) -> List[Tuple[int, int]]:
+        """Разбить текст по словам на строки не шире max_width.
+        
+        Возвращает границы (начало, конец) строк в исходном тексте. Ширина
+        измеряется через font.size, без рендера.
+        """
+        lines = []
+        start = end = 0
+        pos = 0
+        for word in text.split(' '):
+            word_end = pos + len(word)
+            if end == start:
+                # Пробелы в начале строки отбрасываются
+                start = pos
+            elif self.font.size(text[start:word_end])[0] > max_width:
+                lines.append((start, end))
+                start = pos
+            end = word_end
+            pos = word_end + 1
+        if end > start:
+            lines.append((start, end))
+        return lines
     
     def load_scene(self, scene, story, characters_data: Dict):
         """Загрузить сцену (вызывается из главного потока)."""
@@ -2049,14 +2818,59 @@ class MenuPreview:
         # Выбранный элемент
         self.selected_item = None  # (type, id)
         
+        # Нужно ли перерисовать кадр (были команды или ввод)
+        self._dirty = True
+        # Нужно ли вывести на экран весь кадр, а не только области элементов
+        # (команды и смена экрана могут изменить что угодно)
+        self._full_redraw = True
+        # Выведенный кадр: (области элементов или None, выбранный элемент)
+        self._presented: Tuple[Optional[Dict[Tuple[str, str], pygame.Rect]], Any] = (None, None)
+        
         # Ресурсы
         self.background: Optional[pygame.Surface] = None
         self.logo: Optional[pygame.Surface] = None
+        # Изображения грузятся при первой отрисовке, которой они нужны
+        self._background_stale = False
+        self._logo_stale = False
+        # Загруженный фон: (путь, время изменения) или None
+        self._background_key: Optional[Tuple[str, float]] = None
         self.fonts = {}
+        # Отрендеренные надписи: (текст, размер, цвет) -> Surface
+        self._text_cache: OrderedDict = OrderedDict()
+        # Фоны кнопок: (размер, цвета, рамка, скругление) -> Surface
+        self._button_cache: OrderedDict = OrderedDict()
+        # Кнопки целиком (фон с надписью): (оформление, текст) -> (Surface, смещение)
+        self._widget_cache: OrderedDict = OrderedDict()
+        # Градиентный фон по умолчанию: ((ширина, высота), Surface)
+        self._gradient_bg: Optional[Tuple[Tuple[int, int], pygame.Surface]] = None
+        # Исходный логотип: ((путь, время изменения), Surface, непрозрачен ли)
+        self._logo_src: Optional[Tuple[Tuple[str, float], pygame.Surface, bool]] = None
+        # Масштабированные логотипы: (путь, время изменения, масштаб) -> Surface
+        self._logo_cache: OrderedDict = OrderedDict()
+        
+        # Индексы элементов по id (перестраиваются при смене конфига)
+        self._btn_by_id: Dict[str, object] = {}
+        self._slider_by_id: Dict[str, object] = {}
+        self._index_key: Optional[Tuple[int, int]] = None
+        
+        # Области попадания текущего экрана в порядке проверки:
+        # (область, центр элемента, тип, id); перестраиваются при изменении геометрии
+        self._hit_rects: List[Tuple[pygame.Rect, Tuple[int, int], str, str]] = []
+        self._hit_rects_dirty = True
+        self._hit_rects_key: Optional[Tuple[str, int, int]] = None
         
         # Callbacks
         self.on_position_changed: Optional[Callable] = None  # (item_type, item_id, x, y)
         self.on_item_selected: Optional[Callable] = None  # (item_type, item_id)
+        
+        # Обработчики команд из очереди
+        self._cmd_dispatch: Dict[str, Callable] = {
+            'load_config': self._cmd_load_config,
+            'set_screen': self._cmd_set_screen,
+            'update_button': self._cmd_update_button,
+            'update_slider': self._cmd_update_slider,
+            'update_logo': self._cmd_update_logo,
+        }
     
     def start(self):
         """Запустить предпросмотр в отдельном потоке."""
@@ -2102,15 +2916,19 @@ class MenuPreview:
             
             screen = pygame.display.set_mode((self.width, self.height))
             pygame.display.set_caption("Предпросмотр меню (drag & drop)")
+            _allow_events([pygame.QUIT, pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN,
+                           pygame.MOUSEBUTTONUP, pygame.MOUSEMOTION])
             
             clock = pygame.time.Clock()
             
+            self._dirty = True
+            last_draw = 0
             while self.running:
                 # Обработка команд
                 self._process_commands()
                 
                 # События
-                for event in pygame.event.get():
+                for event in _coalesce_motion(pygame.event.get()):
                     if event.type == pygame.QUIT:
                         self.running = False
                     elif event.type == pygame.KEYDOWN:
@@ -2119,6 +2937,7 @@ class MenuPreview:
                         elif event.key == pygame.K_TAB:
                             # Переключение экрана
                             self.current_screen = "settings" if self.current_screen == "main" else "main"
+                            self._dirty = self._full_redraw = True
                     elif event.type == pygame.MOUSEBUTTONDOWN:
                         if event.button == 1:
                             self._handle_mouse_down(event.pos)
@@ -2128,11 +2947,23 @@ class MenuPreview:
                     elif event.type == pygame.MOUSEMOTION:
                         self._handle_mouse_motion(event.pos)
                 
-                # Отрисовка
-                self._draw(screen)
-                
-                pygame.display.flip()
-                clock.tick(60)
+                # Отрисовка только если кадр изменился; в простое - изредка,
+                # чтобы подхватить правки конфига, сделанные редактором напрямую
+                now = pygame.time.get_ticks()
+                if self._dirty or now - last_draw >= _IDLE_REDRAW_MS:
+                    full = self._full_redraw or not self._dirty
+                    self._dirty = self._full_redraw = False
+                    last_draw = now
+                    self._draw(screen)
+                    # После ввода мыши на экран выводятся только изменившиеся элементы
+                    rects = self._changed_rects(full)
+                    if rects is None:
+                        pygame.display.flip()
+                    elif rects:
+                        pygame.display.update(rects)
+                    clock.tick(60)
+                else:
+                    clock.tick(30)
         
         finally:
             try:
@@ -2142,29 +2973,65 @@ class MenuPreview:
             self.running = False
     
     def _process_commands(self):
-        """Обработать команды из очереди."""
-        while not self.command_queue.empty():
-            try:
-                cmd, data = self.command_queue.get_nowait()
-                
-                if cmd == 'load_config':
-                    self._cmd_load_config(data)
-                elif cmd == 'set_screen':
-                    self.current_screen = data
-                elif cmd == 'update_button':
-                    self._cmd_update_button(data)
-                elif cmd == 'update_slider':
-                    self._cmd_update_slider(data)
-                elif cmd == 'update_logo':
-                    self._cmd_update_logo(data)
-                
-            except queue.Empty:
-                break
+        """Обработать команды из очереди (всю очередь за один захват блокировки)."""
+        with self.command_queue.mutex:
+            items = list(self.command_queue.queue)
+            self.command_queue.queue.clear()
+        
+        if items:
+            self._dirty = self._full_redraw = True
+        for cmd, data in items:
+            handler = self._cmd_dispatch.get(cmd)
+            if handler:
+                handler(data)
     
     def _cmd_load_config(self, config):
         """Загрузить конфигурацию."""
         self.config = config
-        self._load_resources()
+        self._index_items()
+        self._background_stale = self._logo_stale = True
+        self._hit_rects_dirty = True
+    
+    def _index_items(self):
+        """Перестроить индексы кнопок и слайдеров по id."""
+        self._btn_by_id = {}
+        self._slider_by_id = {}
+        self._index_key = None
+        if not self.config:
+            return
+        
+        # setdefault - при повторяющихся id побеждает первый, как при поиске перебором
+        for btn in self.config.buttons:
+            self._btn_by_id.setdefault(btn.id, btn)
+        for slider in self.config.sliders:
+            self._slider_by_id.setdefault(slider.id, slider)
+        self._index_key = (len(self.config.buttons), len(self.config.sliders))
+    
+    def _find_item(self, item_type: str, item_id: str):
+        """Найти кнопку ("button") или слайдер ("slider") по id.
+        
+        Редактор правит тот же объект конфига напрямую (добавляет и удаляет
+        элементы, меняет id), поэтому индекс перестраивается, если изменилось
+        число элементов, найденный элемент сменил id или id не найден.
+        Кнопка "Назад" в индекс не входит и перестройку не вызывает.
+        """
+        if self._index_key != (len(self.config.buttons), len(self.config.sliders)):
+            self._index_items()
+        index = self._btn_by_id if item_type == "button" else self._slider_by_id
+        item = index.get(item_id)
+        if item is None:
+            stale = not (item_type == "button" and self.config.back_button.id == item_id)
+        else:
+            stale = item.id != item_id
+        if stale:
+            self._index_items()
+            index = self._btn_by_id if item_type == "button" else self._slider_by_id
+            item = index.get(item_id)
+        return item
+    
+    def _cmd_set_screen(self, screen: str):
+        """Переключить экран."""
+        self.current_screen = screen
     
     def _cmd_update_button(self, data):
         """Обновить кнопку."""
@@ -2172,17 +3039,16 @@ class MenuPreview:
         if not self.config:
             return
         
-        for btn in self.config.buttons:
-            if btn.id == btn_id:
-                for key, value in kwargs.items():
-                    if hasattr(btn, key):
-                        setattr(btn, key, value)
-                return
+        self._hit_rects_dirty = True
+        btn = self._find_item("button", btn_id)
+        if btn is not None:
+            _apply_fields(btn, kwargs)
+            if 'id' in kwargs:
+                self._index_items()
+            return
         
         if self.config.back_button.id == btn_id:
-            for key, value in kwargs.items():
-                if hasattr(self.config.back_button, key):
-                    setattr(self.config.back_button, key, value)
+            _apply_fields(self.config.back_button, kwargs)
     
     def _cmd_update_slider(self, data):
         """Обновить слайдер."""
@@ -2190,61 +3056,120 @@ class MenuPreview:
         if not self.config:
             return
         
-        for slider in self.config.sliders:
-            if slider.id == slider_id:
-                for key, value in kwargs.items():
-                    if hasattr(slider, key):
-                        setattr(slider, key, value)
-                return
+        self._hit_rects_dirty = True
+        slider = self._find_item("slider", slider_id)
+        if slider is not None:
+            _apply_fields(slider, kwargs)
+            if 'id' in kwargs:
+                self._index_items()
     
     def _cmd_update_logo(self, kwargs):
         """Обновить логотип."""
         if not self.config:
             return
         
-        for key, value in kwargs.items():
-            if hasattr(self.config.logo, key):
-                setattr(self.config.logo, key, value)
+        self._hit_rects_dirty = True
+        _apply_fields(self.config.logo, kwargs)
         
-        # Перезагружаем логотип если изменился путь
-        if 'image_path' in kwargs:
-            self._load_logo()
+        # Перестраиваем логотип если изменился путь или масштаб
+        if 'image_path' in kwargs or 'scale' in kwargs:
+            self._logo_stale = True
     
     def _load_resources(self):
-        """Загрузить ресурсы."""
+        """Загрузить изображения, отложенные с load_config, если они нужны сейчас.
+        
+        Фон нужен обоим экранам, логотип - только главному. Вызывается только
+        из потока отрисовки (перед отрисовкой и проверкой попаданий) после
+        set_mode: convert() приводит изображения к формату окна, чтобы blit
+        каждого кадра шёл без попиксельного преобразования.
+        """
         if not self.config:
             return
         
-        # Фон
-        if self.config.background and os.path.exists(self.config.background):
-            try:
-                self.background = pygame.image.load(self.config.background).convert()
-                self.background = pygame.transform.smoothscale(self.background, (self.width, self.height))
-            except:
-                self.background = None
+        if self._background_stale:
+            self._background_stale = False
+            self._load_background()
+        
+        if self._logo_stale and self.current_screen == "main":
+            self._logo_stale = False
+            self._load_logo()
+            self._hit_rects_dirty = True
+    
+    def _load_background(self):
+        """Загрузить фон (повторно - только если сменился путь или файл)."""
+        path = self.config.background
+        try:
+            key = (os.path.abspath(path), os.path.getmtime(path)) if path else None
+        except OSError:
+            key = None
+        if key is not None and key == self._background_key:
+            return
+        
+        # Сначала масштабируем, затем convert - преобразуются только пиксели окна
+        raw = _load_raw_image(path) if key is not None else None
+        if raw is not None:
+            self.background = pygame.transform.smoothscale(raw, (self.width, self.height)).convert()
+            self._background_key = key
         else:
             self.background = None
-        
-        # Логотип
-        self._load_logo()
+            self._background_key = None
     
     def _load_logo(self):
-        """Загрузить логотип."""
+        """Загрузить логотип.
+        
+        Исходник читается с диска один раз на путь и время изменения файла,
+        масштабированные копии кэшируются - перетаскивание ползунка масштаба
+        в редакторе не пересчитывает уже встречавшиеся размеры. Логотип без
+        прозрачных пикселей хранится без альфа-канала: такой blit быстрее.
+        """
         if not self.config:
             return
         
-        if self.config.logo.image_path and os.path.exists(self.config.logo.image_path):
-            try:
-                self.logo = pygame.image.load(self.config.logo.image_path).convert_alpha()
-                if self.config.logo.scale != 1.0:
-                    new_w = int(self.logo.get_width() * self.config.logo.scale)
-                    new_h = int(self.logo.get_height() * self.config.logo.scale)
-                    if new_w > 0 and new_h > 0:
-                        self.logo = pygame.transform.smoothscale(self.logo, (new_w, new_h))
-            except:
-                self.logo = None
-        else:
+        path = self.config.logo.image_path
+        try:
+            src_key = (os.path.abspath(path), os.path.getmtime(path)) if path else None
+        except OSError:
+            src_key = None
+        if src_key is None:
             self.logo = None
+            return
+        
+        scale = self.config.logo.scale
+        key = src_key + (scale,)
+        cache = self._logo_cache
+        logo = cache.get(key)
+        if logo is not None:
+            cache.move_to_end(key)
+            self.logo = logo
+            return
+        
+        if self._logo_src is not None and self._logo_src[0] == src_key:
+            logo, opaque = self._logo_src[1], self._logo_src[2]
+        else:
+            logo = _load_raw_image(path)
+            if logo is None:
+                self.logo = None
+                return
+            # Логотип невелик - приводим к формату окна до масштабирования,
+            # чтобы smoothscale всегда работал с 32-битным изображением с альфой
+            logo = logo.convert_alpha()
+            # Маска с порогом 254 отмечает только полностью непрозрачные пиксели
+            # (colorkey после convert_alpha тоже становится прозрачностью)
+            opaque = pygame.mask.from_surface(logo, 254).count() == logo.get_width() * logo.get_height()
+            self._logo_src = (src_key, logo, opaque)
+        
+        if scale != 1.0:
+            new_w = int(logo.get_width() * scale)
+            new_h = int(logo.get_height() * scale)
+            if new_w > 0 and new_h > 0:
+                logo = pygame.transform.smoothscale(logo, (new_w, new_h))
+        if opaque:
+            logo = logo.convert()
+        
+        cache[key] = logo
+        if len(cache) > _LOGO_CACHE_SIZE:
+            cache.popitem(last=False)
+        self.logo = logo
     
     def _get_font(self, size: int) -> pygame.font.Font:
         """Получить шрифт."""
@@ -2252,94 +3177,90 @@ class MenuPreview:
             self.fonts[size] = pygame.font.Font(None, size)
         return self.fonts[size]
     
+    def _render_text(self, text: str, size: int, color: Tuple[int, int, int]) -> pygame.Surface:
+        """Отрендерить надпись с кэшированием.
+        
+        Подписи кнопок и слайдеров меняются только при правке в редакторе,
+        поэтому каждый кадр берутся готовые поверхности.
+        """
+        key = (text, size, color)
+        surface = self._text_cache.get(key)
+        if surface is not None:
+            self._text_cache.move_to_end(key)
+            return surface
+        
+        surface = self._get_font(size).render(text, True, color)
+        self._text_cache[key] = surface
+        if len(self._text_cache) > _TEXT_CACHE_SIZE:
+            self._text_cache.popitem(last=False)
+        return surface
+    
     def _hex_to_rgba(self, hex_color: str) -> Tuple[int, int, int, int]:
         """Конвертировать HEX в RGBA."""
-        hex_color = hex_color.lstrip('#')
-        if len(hex_color) == 6:
-            r, g, b = int(hex_color[0:2], 16), int(hex_color[2:4], 16), int(hex_color[4:6], 16)
-            return (r, g, b, 255)
-        elif len(hex_color) == 8:
-            r, g, b, a = int(hex_color[0:2], 16), int(hex_color[2:4], 16), int(hex_color[4:6], 16), int(hex_color[6:8], 16)
-            return (r, g, b, a)
-        return (255, 255, 255, 255)
+        return _hex_to_rgba(hex_color)
     
     def _hex_to_rgb(self, hex_color: str) -> Tuple[int, int, int]:
         """Конвертировать HEX в RGB."""
-        rgba = self._hex_to_rgba(hex_color)
-        return (rgba[0], rgba[1], rgba[2])
+        return _hex_to_rgb(hex_color)
     
     def _handle_mouse_down(self, pos):
         """Обработать нажатие мыши."""
+        self._dirty = True
         if not self.config:
             return
         
-        # Проверяем логотип (только на главном экране)
-        if self.current_screen == "main" and self.logo:
-            logo_rect = self._get_logo_rect()
-            if logo_rect.collidepoint(pos):
-                self.dragging_item = ("logo", "logo")
-                self.drag_offset = (pos[0] - logo_rect.centerx, pos[1] - logo_rect.centery)
-                self.selected_item = ("logo", "logo")
+        self._load_resources()
+        # Редактор может добавить или удалить элементы прямо в общем конфиге
+        key = (self.current_screen, len(self.config.buttons), len(self.config.sliders))
+        if self._hit_rects_dirty or key != self._hit_rects_key:
+            self._rebuild_hit_rects()
+            self._hit_rects_key = key
+        
+        for rect, (cx, cy), item_type, item_id in self._hit_rects:
+            if rect.collidepoint(pos):
+                self.dragging_item = (item_type, item_id)
+                self.drag_offset = (pos[0] - cx, pos[1] - cy)
+                self.selected_item = (item_type, item_id)
                 if self.on_item_selected:
-                    self.on_item_selected("logo", "logo")
+                    self.on_item_selected(item_type, item_id)
                 return
         
-        # Проверяем кнопки
+        # Клик мимо - снимаем выделение
+        self.selected_item = None
+        if self.on_item_selected:
+            self.on_item_selected(None, None)
+    
+    def _rebuild_hit_rects(self):
+        """Перестроить области попадания для текущего экрана."""
+        hits = []
         if self.current_screen == "main":
+            # Логотип проверяется первым
+            if self.logo:
+                rect = self._get_logo_rect()
+                hits.append((rect, rect.center, "logo", "logo"))
             for btn in self.config.buttons:
                 if btn.visible:
                     rect = self._get_button_rect(btn)
-                    if rect.collidepoint(pos):
-                        self.dragging_item = ("button", btn.id)
-                        self.drag_offset = (pos[0] - rect.centerx, pos[1] - rect.centery)
-                        self.selected_item = ("button", btn.id)
-                        if self.on_item_selected:
-                            self.on_item_selected("button", btn.id)
-                        return
+                    hits.append((rect, rect.center, "button", btn.id))
         else:
-            # Настройки
-            # Заголовок
-            title_rect = self._get_title_rect()
-            if title_rect.collidepoint(pos):
-                self.dragging_item = ("title", "settings_title")
-                self.drag_offset = (pos[0] - title_rect.centerx, pos[1] - title_rect.centery)
-                self.selected_item = ("title", "settings_title")
-                if self.on_item_selected:
-                    self.on_item_selected("title", "settings_title")
-                return
-            
-            # Слайдеры
+            rect = self._get_title_rect()
+            hits.append((rect, rect.center, "title", "settings_title"))
             for slider in self.config.sliders:
                 track_rect = self._get_slider_track_rect(slider)
                 # Расширенная область для перетаскивания (включая подпись)
                 drag_rect = pygame.Rect(track_rect.x, track_rect.y - 30, track_rect.width + 60, track_rect.height + 35)
-                if drag_rect.collidepoint(pos):
-                    self.dragging_item = ("slider", slider.id)
-                    self.drag_offset = (pos[0] - track_rect.centerx, pos[1] - track_rect.centery)
-                    self.selected_item = ("slider", slider.id)
-                    if self.on_item_selected:
-                        self.on_item_selected("slider", slider.id)
-                    return
-            
-            # Кнопка "Назад"
+                hits.append((drag_rect, track_rect.center, "slider", slider.id))
             btn = self.config.back_button
             rect = self._get_button_rect(btn)
-            if rect.collidepoint(pos):
-                self.dragging_item = ("button", btn.id)
-                self.drag_offset = (pos[0] - rect.centerx, pos[1] - rect.centery)
-                self.selected_item = ("button", btn.id)
-                if self.on_item_selected:
-                    self.on_item_selected("button", btn.id)
-                return
+            hits.append((rect, rect.center, "button", btn.id))
         
-        # Клик мимо - снимаем выделение
-        self.selected_item = None
-        if self.on_item_selected:
-            self.on_item_selected(None, None)
+        self._hit_rects = hits
+        self._hit_rects_dirty = False
     
     def _handle_mouse_up(self, pos):
         """Обработать отпускание мыши."""
         self.dragging_item = None
+        self._dirty = True
     
     def _handle_mouse_motion(self, pos):
         """Обработать движение мыши."""
@@ -2348,6 +3269,9 @@ class MenuPreview:
         
         item_type, item_id = self.dragging_item
         
+        self._hit_rects_dirty = True
+        self._dirty = True
+        
         # Вычисляем новую позицию (0.0 - 1.0)
         new_x = (pos[0] - self.drag_offset[0]) / self.width
         new_y = (pos[1] - self.drag_offset[1]) / self.height
@@ -2361,20 +3285,18 @@ class MenuPreview:
             self.config.logo.x = new_x
             self.config.logo.y = new_y
         elif item_type == "button":
-            for btn in self.config.buttons:
-                if btn.id == item_id:
-                    btn.x = new_x
-                    btn.y = new_y
-                    break
+            btn = self._find_item("button", item_id)
+            if btn is not None:
+                btn.x = new_x
+                btn.y = new_y
             if self.config.back_button.id == item_id:
                 self.config.back_button.x = new_x
                 self.config.back_button.y = new_y
         elif item_type == "slider":
-            for slider in self.config.sliders:
-                if slider.id == item_id:
-                    slider.x = new_x
-                    slider.y = new_y
-                    break
+            slider = self._find_item("slider", item_id)
+            if slider is not None:
+                slider.x = new_x
+                slider.y = new_y
         elif item_type == "title":
             self.config.settings_title_x = new_x
             self.config.settings_title_y = new_y
@@ -2383,6 +3305,66 @@ class MenuPreview:
         if self.on_position_changed:
             self.on_position_changed(item_type, item_id, new_x, new_y)
     
+    def _element_rects(self) -> Optional[Dict[Tuple[str, str], pygame.Rect]]:
+        """Области, которые занимают элементы текущего экрана вместе с рамкой выделения.
+        
+        None, если области не различимы по (тип, id) (повторяющиеся id).
+        """
+        if not self.config:
+            return None
+        
+        rects = {}
+        count = 0
+        if self.current_screen == "main":
+            if self.logo:
+                rects[("logo", "logo")] = self._get_logo_rect().inflate(4, 4)
+                count += 1
+            for btn in self.config.buttons:
+                if btn.visible:
+                    rects[("button", btn.id)] = self._button_area(btn)
+                    count += 1
+        else:
+            rects[("title", "settings_title")] = self._get_title_rect().inflate(14, 14)
+            for slider in self.config.sliders:
+                # Подпись сверху и значение в процентах справа от трека
+                track_rect = self._get_slider_track_rect(slider)
+                label = self._render_text(slider.label, 24, self._hex_to_rgb(slider.label_color))
+                width = max(track_rect.width + 100, label.get_width() + 20)
+                rects[("slider", slider.id)] = pygame.Rect(track_rect.x - 15, track_rect.y - 35,
+                                                           width, track_rect.height + 50)
+            btn = self.config.back_button
+            rects[("button", btn.id)] = self._button_area(btn)
+            count += 2 + len(self.config.sliders)
+        return rects if len(rects) == count else None
+    
+    def _button_area(self, btn) -> pygame.Rect:
+        """Область кнопки на экране: сведённая surface (надпись может выходить
+        за кнопку) вместе с рамкой выделения."""
+        rect = self._get_button_rect(btn)
+        surface, pos = self._button_blit(btn, rect)
+        return surface.get_rect(topleft=pos).union(rect.inflate(8, 8))
+    
+    def _changed_rects(self, full: bool) -> Optional[List[pygame.Rect]]:
+        """Области экрана, изменившиеся с прошлого вывода (None - выводить весь кадр).
+        
+        Мышь меняет только положение и выделение элементов, поэтому после неё
+        достаточно обновить старые и новые области сдвинутых элементов и тех,
+        у кого сменилось выделение.
+        """
+        prev_rects, prev_selected = self._presented
+        rects = self._element_rects()
+        selected = self.selected_item
+        self._presented = (rects, selected)
+        if full or prev_rects is None or rects is None:
+            return None
+        
+        changed = []
+        for key in prev_rects.keys() | rects.keys():
+            old, new = prev_rects.get(key), rects.get(key)
+            if old != new or (selected != prev_selected and key in (selected, prev_selected)):
+                changed.extend(rect for rect in (old, new) if rect is not None)
+        return changed
+    
     def _get_logo_rect(self) -> pygame.Rect:
         """Получить прямоугольник логотипа."""
         if not self.logo or not self.config:
@@ -2409,35 +3391,45 @@ class MenuPreview:
         if not self.config:
             return pygame.Rect(0, 0, 0, 0)
         
-        font = self._get_font(self.config.settings_title_size)
-        text_surface = font.render(self.config.settings_title, True, (255, 255, 255))
-        x = int(self.config.settings_title_x * self.width - text_surface.get_width() / 2)
-        y = int(self.config.settings_title_y * self.height - text_surface.get_height() / 2)
-        return pygame.Rect(x, y, text_surface.get_width(), text_surface.get_height())
+        return self._title_rect(self._render_title())
+    
+    def _render_title(self) -> pygame.Surface:
+        """Отрендерить заголовок настроек (тот же кэшированный surface, что рисуется).
+        
+        font.size() не годится для замера: высота отрендеренного текста
+        зависит от глифов и может быть больше метрик шрифта.
+        """
+        title_color = self._hex_to_rgb(self.config.settings_title_color)
+        return self._render_text(self.config.settings_title, self.config.settings_title_size, title_color)
+    
+    def _title_rect(self, title_surface: pygame.Surface) -> pygame.Rect:
+        """Прямоугольник заголовка настроек по его отрендеренному surface."""
+        w, h = title_surface.get_size()
+        x = int(self.config.settings_title_x * self.width - w / 2)
+        y = int(self.config.settings_title_y * self.height - h / 2)
+        return pygame.Rect(x, y, w, h)
     
     def _draw(self, screen: pygame.Surface):
         """Отрисовка."""
         if not self.config:
             screen.fill((30, 30, 50))
-            font = self._get_font(36)
-            text = font.render("Загрузите конфигурацию меню", True, (150, 150, 150))
+            text = self._render_text("Загрузите конфигурацию меню", 36, (150, 150, 150))
             screen.blit(text, (self.width // 2 - text.get_width() // 2, self.height // 2))
             return
         
+        self._load_resources()
+        
         # Фон
         if self.background:
             screen.blit(self.background, (0, 0))
         elif self.config.background_color:
             screen.fill(self.config.background_color)
         else:
-            # Градиент
-            for y in range(self.height):
-                color = (
-                    int(20 + (y / self.height) * 30),
-                    int(20 + (y / self.height) * 40),
-                    int(40 + (y / self.height) * 60)
-                )
-                pygame.draw.line(screen, color, (0, y), (self.width, y))
+            # Градиент строится один раз на размер окна
+            size = (self.width, self.height)
+            if self._gradient_bg is None or self._gradient_bg[0] != size:
+                self._gradient_bg = (size, _vertical_gradient(self.width, self.height, (20, 20, 40), (30, 40, 60)))
+            screen.blit(self._gradient_bg[1], (0, 0))
         
         if self.current_screen == "main":
             self._draw_main_menu(screen)
@@ -2445,8 +3437,7 @@ class MenuPreview:
             self._draw_settings_menu(screen)
         
         # Подсказка
-        hint_font = self._get_font(20)
-        hint = hint_font.render("Tab - переключить экран | Перетаскивайте элементы мышью", True, (200, 200, 200))
+        hint = self._render_text("Tab - переключить экран | Перетаскивайте элементы мышью", 20, (200, 200, 200))
         screen.blit(hint, (10, self.height - 25))
     
     def _draw_main_menu(self, screen: pygame.Surface):
@@ -2462,8 +3453,7 @@ class MenuPreview:
         
         # Заглушка для логотипа если нет изображения
         if not self.logo:
-            font = self._get_font(48)
-            text = font.render("[ЛОГОТИП]", True, (100, 100, 100))
+            text = self._render_text("[ЛОГОТИП]", 48, (100, 100, 100))
             x = int(self.config.logo.x * self.width - text.get_width() / 2)
             y = int(self.config.logo.y * self.height - text.get_height() / 2)
             rect = pygame.Rect(x - 10, y - 10, text.get_width() + 20, text.get_height() + 20)
@@ -2475,23 +3465,17 @@ class MenuPreview:
                 pygame.draw.rect(screen, (255, 255, 0), rect, 2)
         
         # Кнопки
-        for btn in self.config.buttons:
-            if btn.visible:
-                self._draw_button(screen, btn)
+        self._draw_buttons(screen, [btn for btn in self.config.buttons if btn.visible])
     
     def _draw_settings_menu(self, screen: pygame.Surface):
         """Отрисовать меню настроек."""
         # Заголовок
-        font = self._get_font(self.config.settings_title_size)
-        title_color = self._hex_to_rgb(self.config.settings_title_color)
-        title_surface = font.render(self.config.settings_title, True, title_color)
-        title_x = int(self.config.settings_title_x * self.width - title_surface.get_width() / 2)
-        title_y = int(self.config.settings_title_y * self.height - title_surface.get_height() / 2)
-        screen.blit(title_surface, (title_x, title_y))
+        title_surface = self._render_title()
+        title_rect = self._title_rect(title_surface)
+        screen.blit(title_surface, title_rect)
         
         # Выделение заголовка
         if self.selected_item == ("title", "settings_title"):
-            title_rect = self._get_title_rect()
             pygame.draw.rect(screen, (255, 255, 0), title_rect.inflate(10, 10), 2)
         
         # Слайдеры
@@ -2499,36 +3483,102 @@ class MenuPreview:
             self._draw_slider(screen, slider)
         
         # Кнопка "Назад"
-        self._draw_button(screen, self.config.back_button)
+        self._draw_buttons(screen, [self.config.back_button])
+    
+    def _draw_buttons(self, screen: pygame.Surface, buttons: list):
+        """Отрисовать кнопки, объединяя невыделенные в один fblits.
+        
+        Выделенная кнопка рисуется отдельно после уже накопленных, поэтому
+        порядок наложения не меняется.
+        """
+        batch = []
+        for btn in buttons:
+            if self.selected_item == ("button", btn.id):
+                if batch:
+                    screen.fblits(batch, pygame.BLEND_PREMULTIPLIED)
+                    batch = []
+                self._draw_button(screen, btn)
+            else:
+                batch.append(self._button_blit(btn, self._get_button_rect(btn)))
+        if batch:
+            screen.fblits(batch, pygame.BLEND_PREMULTIPLIED)
+    
+    def _button_blit(self, btn, rect: pygame.Rect) -> Tuple[pygame.Surface, Tuple[int, int]]:
+        """Сведённая кнопка и позиция для blit с BLEND_PREMULTIPLIED."""
+        surface, (dx, dy) = self._get_widget_surface(btn, rect.size)
+        return surface, (rect.x + dx, rect.y + dy)
+    
+    def _get_widget_surface(self, btn, size: Tuple[int, int]) -> Tuple[pygame.Surface, Tuple[int, int]]:
+        """Фон кнопки с надписью, сведённые в одну surface (с кэшированием).
+        
+        Фон полупрозрачный, поэтому слои сводятся в premultiplied alpha:
+        результат выводится одним blit с BLEND_PREMULTIPLIED и совпадает
+        с наложением фона и надписи по очереди (с точностью до округления).
+        Надпись может выходить за кнопку - тогда surface больше кнопки,
+        а смещение её левого верхнего угла возвращается вместе с ней.
+        """
+        text_color = self._hex_to_rgb(btn.text_color)
+        key = (size, btn.bg_color, btn.border_color, btn.border_width, btn.border_radius,
+               btn.text, btn.font_size, text_color)
+        entry = self._widget_cache.get(key)
+        if entry is not None:
+            self._widget_cache.move_to_end(key)
+            return entry
+        
+        width, height = size
+        text_surface = self._render_text(btn.text, btn.font_size, text_color)
+        text_rect = text_surface.get_rect(topleft=(width // 2 - text_surface.get_width() // 2,
+                                                   height // 2 - text_surface.get_height() // 2))
+        bounds = pygame.Rect(0, 0, width, height).union(text_rect)
+        
+        widget = pygame.Surface(bounds.size, pygame.SRCALPHA)
+        widget.blit(self._get_button_surface(btn, size).premul_alpha(), (-bounds.x, -bounds.y),
+                    special_flags=pygame.BLEND_PREMULTIPLIED)
+        widget.blit(text_surface.premul_alpha(), text_rect.move(-bounds.x, -bounds.y),
+                    special_flags=pygame.BLEND_PREMULTIPLIED)
+        
+        entry = (widget, bounds.topleft)
+        self._widget_cache[key] = entry
+        if len(self._widget_cache) > _TEXT_CACHE_SIZE:
+            self._widget_cache.popitem(last=False)
+        return entry
     
     def _draw_button(self, screen: pygame.Surface, btn):
         """Отрисовать кнопку."""
         rect = self._get_button_rect(btn)
+        surface, pos = self._button_blit(btn, rect)
+        screen.blit(surface, pos, special_flags=pygame.BLEND_PREMULTIPLIED)
         
-        bg_color = self._hex_to_rgba(btn.bg_color)
-        border_color = self._hex_to_rgb(btn.border_color)
-        text_color = self._hex_to_rgb(btn.text_color)
+        # Выделение
+        if self.selected_item == ("button", btn.id):
+            pygame.draw.rect(screen, (255, 255, 0), rect.inflate(4, 4), 2)
+    
+    def _get_button_surface(self, btn, size: Tuple[int, int]) -> pygame.Surface:
+        """Фон и рамка кнопки с кэшированием.
         
-        # Фон
-        btn_surface = pygame.Surface((rect.width, rect.height), pygame.SRCALPHA)
-        pygame.draw.rect(btn_surface, bg_color, (0, 0, rect.width, rect.height), border_radius=btn.border_radius)
+        Ключ - сами параметры оформления, поэтому правка кнопки в редакторе
+        (через update_button или напрямую в конфиге) сразу даёт новый фон.
+        """
+        key = (size, btn.bg_color, btn.border_color, btn.border_width, btn.border_radius)
+        btn_surface = self._button_cache.get(key)
+        if btn_surface is not None:
+            self._button_cache.move_to_end(key)
+            return btn_surface
+        
+        width, height = size
+        btn_surface = pygame.Surface(size, pygame.SRCALPHA)
+        pygame.draw.rect(btn_surface, self._hex_to_rgba(btn.bg_color), (0, 0, width, height),
+                         border_radius=btn.border_radius)
         
         # Рамка
         if btn.border_width > 0:
-            pygame.draw.rect(btn_surface, border_color, (0, 0, rect.width, rect.height), btn.border_width, border_radius=btn.border_radius)
-        
-        screen.blit(btn_surface, rect.topleft)
-        
-        # Текст
-        font = self._get_font(btn.font_size)
-        text_surface = font.render(btn.text, True, text_color)
-        text_x = rect.centerx - text_surface.get_width() // 2
-        text_y = rect.centery - text_surface.get_height() // 2
-        screen.blit(text_surface, (text_x, text_y))
+            pygame.draw.rect(btn_surface, self._hex_to_rgb(btn.border_color), (0, 0, width, height),
+                             btn.border_width, border_radius=btn.border_radius)
         
-        # Выделение
-        if self.selected_item == ("button", btn.id):
-            pygame.draw.rect(screen, (255, 255, 0), rect.inflate(4, 4), 2)
+        self._button_cache[key] = btn_surface
+        if len(self._button_cache) > _TEXT_CACHE_SIZE:
+            self._button_cache.popitem(last=False)
+        return btn_surface
     
     def _draw_slider(self, screen: pygame.Surface, slider):
         """Отрисовать слайдер."""
@@ -2540,8 +3590,7 @@ class MenuPreview:
         label_color = self._hex_to_rgb(slider.label_color)
         
         # Подпись
-        font = self._get_font(24)
-        label_surface = font.render(slider.label, True, label_color)
+        label_surface = self._render_text(slider.label, 24, label_color)
         screen.blit(label_surface, (track_rect.x, track_rect.y - 25))
         
         # Трек
@@ -2560,7 +3609,7 @@ class MenuPreview:
         
         # Значение
         value_text = f"{int(slider.value * 100)}%"
-        value_surface = font.render(value_text, True, label_color)
+        value_surface = self._render_text(value_text, 24, label_color)
         screen.blit(value_surface, (track_rect.right + 10, track_rect.centery - value_surface.get_height() // 2))
         
         # Выделение
@@ -2603,25 +3652,69 @@ class PauseMenuPreview:
         self.on_position_changed = None
         self.on_element_selected = None
         self.fonts = {}
+        # Отрендеренные надписи: (текст, размер, цвет) -> Surface
+        self._text_cache: OrderedDict = OrderedDict()
+        # Фоны панели, кнопок и слотов: (размер, цвета, рамка, скругление, выделение) -> Surface
+        self._box_cache: OrderedDict = OrderedDict()
+        # Нужно ли перерисовать кадр (были команды или ввод)
+        self._dirty = True
+        # Фон с затемнением, собранный один раз: ключ (цвет, прозрачность)
+        self._backdrop: Optional[pygame.Surface] = None
+        self._backdrop_key: Optional[Tuple[str, int]] = None
+        # Обработчики команд из очереди ("refresh" только будит цикл)
+        self._cmd_dispatch: Dict[str, Callable] = {
+            "set_screen": self._cmd_set_screen,
+        }
     
     def _get_font(self, size: int) -> pygame.font.Font:
         if size not in self.fonts:
             self.fonts[size] = pygame.font.Font(None, size)
         return self.fonts[size]
     
+    def _render_text(self, text: str, size: int, color: Tuple[int, int, int]) -> pygame.Surface:
+        # Надписи меняются только при правке в редакторе - кэш как в MenuPreview
+        key = (text, size, color)
+        surface = self._text_cache.get(key)
+        if surface is not None:
+            self._text_cache.move_to_end(key)
+            return surface
+        
+        surface = self._get_font(size).render(text, True, color)
+        self._text_cache[key] = surface
+        if len(self._text_cache) > _TEXT_CACHE_SIZE:
+            self._text_cache.popitem(last=False)
+        return surface
+    
+    def _get_box(self, size: Tuple[int, int], bg_color: str, border_color: str,
+                 border_width: int, border_radius: int, sel: bool) -> pygame.Surface:
+        # Скруглённый фон с рамкой; ключ - сами параметры оформления, поэтому
+        # правка конфига в редакторе сразу даёт новую поверхность
+        key = (size, bg_color, border_color, border_width, border_radius, sel)
+        surface = self._box_cache.get(key)
+        if surface is not None:
+            self._box_cache.move_to_end(key)
+            return surface
+        
+        surface = pygame.Surface(size, pygame.SRCALPHA)
+        pygame.draw.rect(surface, self._parse_color(bg_color), surface.get_rect(), border_radius=border_radius)
+        bc = (255, 200, 0) if sel else self._parse_rgb(border_color)
+        pygame.draw.rect(surface, bc, surface.get_rect(), width=border_width + (2 if sel else 0), border_radius=border_radius)
+        self._box_cache[key] = surface
+        if len(self._box_cache) > _TEXT_CACHE_SIZE:
+            self._box_cache.popitem(last=False)
+        return surface
+    
     def _parse_color(self, color_str: str) -> Tuple[int, int, int, int]:
-        color_str = color_str.lstrip('#')
-        if len(color_str) == 6:
-            r, g, b = int(color_str[0:2], 16), int(color_str[2:4], 16), int(color_str[4:6], 16)
-            return (r, g, b, 255)
-        elif len(color_str) == 8:
-            r, g, b = int(color_str[0:2], 16), int(color_str[2:4], 16), int(color_str[4:6], 16)
-            a = int(color_str[6:8], 16)
-            return (r, g, b, a)
-        return (255, 255, 255, 255)
+        return _hex_to_rgba(color_str)
+    
+    def _parse_rgb(self, color_str: str) -> Tuple[int, int, int]:
+        # Кэшированный RGB без среза [:3] (новый кортеж) на каждый вызов
+        return _hex_to_rgb(color_str)
     
     def load_config(self, config):
         self.config = config
+        self._backdrop_key = None
+        self._dirty = True
     
     def set_screen(self, screen_name: str):
         self.current_screen = screen_name
@@ -2643,32 +3736,67 @@ class PauseMenuPreview:
         pygame.init()
         screen = pygame.display.set_mode((self.width, self.height))
         pygame.display.set_caption("Превью меню паузы")
-        clock = pygame.time.Clock()
+        _allow_events([pygame.QUIT, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP,
+                       pygame.MOUSEMOTION])
         
+        self._dirty = True
+        last_draw = 0
+        timeout = 0.0
         while self.running:
-            while not self.command_queue.empty():
-                try:
-                    cmd, args = self.command_queue.get_nowait()
-                    if cmd == "set_screen":
-                        self.current_screen = args
-                except queue.Empty:
-                    break
+            # Ожидание очереди заменяет clock.tick: поток спит до команды
+            # от редактора или до следующего кадра
+            try:
+                first = self.command_queue.get(timeout=timeout)
+            except queue.Empty:
+                first = None
+            frame_start = pygame.time.get_ticks()
+            self._process_commands(first)
             
-            for event in pygame.event.get():
+            for event in _coalesce_motion(pygame.event.get()):
                 if event.type == pygame.QUIT:
                     self.running = False
                 elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                     self._handle_mouse_down(event.pos)
+                    self._dirty = True
                 elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
                     self.dragging = False
                 elif event.type == pygame.MOUSEMOTION and self.dragging:
                     self._handle_drag(event.pos)
+                    self._dirty = True
             
-            self._draw(screen)
-            pygame.display.flip()
-            clock.tick(60)
+            # В простое кадр всё равно изредка перерисовывается - редактор
+            # может поменять конфиг напрямую, не вызывая refresh()
+            if self._dirty or frame_start - last_draw >= _IDLE_REDRAW_MS:
+                self._dirty = False
+                last_draw = frame_start
+                self._draw(screen)
+                pygame.display.flip()
+                timeout = max(0.0, 1 / 60 - (pygame.time.get_ticks() - frame_start) / 1000)
+            else:
+                timeout = _IDLE_WAIT
         pygame.quit()
     
+    def _process_commands(self, first=None):
+        """Обработать команды из очереди (всю очередь за один захват блокировки).
+        
+        first - команда, уже полученная из очереди при ожидании.
+        """
+        with self.command_queue.mutex:
+            items = list(self.command_queue.queue)
+            self.command_queue.queue.clear()
+        if first is not None:
+            items.insert(0, first)
+        
+        if items:
+            self._dirty = True
+        for cmd, args in items:
+            handler = self._cmd_dispatch.get(cmd)
+            if handler:
+                handler(args)
+    
+    def _cmd_set_screen(self, screen_name: str):
+        self.current_screen = screen_name
+    
     def _get_panel_rect(self) -> pygame.Rect:
         if not self.config:
             return pygame.Rect(self.width // 2 - 200, self.height // 2 - 250, 400, 500)
@@ -2794,12 +3922,10 @@ class PauseMenuPreview:
                 self.on_position_changed("slot_grid", "grid", new_x, new_y)
     
     def _draw(self, screen):
-        screen.fill((30, 30, 50))
         if self.config:
-            overlay = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
-            c = self._parse_color(self.config.overlay_color)
-            overlay.fill((c[0], c[1], c[2], self.config.overlay_alpha))
-            screen.blit(overlay, (0, 0))
+            screen.blit(self._get_backdrop(), (0, 0))
+        else:
+            screen.fill((30, 30, 50))
         
         if self.current_screen == "main":
             self._draw_main(screen)
@@ -2808,23 +3934,38 @@ class PauseMenuPreview:
         elif self.current_screen in ("save", "load"):
             self._draw_save_load(screen)
         
-        hint = self._get_font(20).render("Перетаскивайте элементы", True, (200, 200, 200))
+        hint = self._render_text("Перетаскивайте элементы", 20, (200, 200, 200))
         screen.blit(hint, (10, self.height - 30))
     
+    def _get_backdrop(self) -> pygame.Surface:
+        """Фон с полупрозрачным затемнением поверх.
+        
+        Полноэкранный SRCALPHA-слой и его смешивание пересчитываются только при
+        смене цвета или прозрачности (редактор меняет их прямо в конфиге).
+        """
+        key = (self.config.overlay_color, self.config.overlay_alpha)
+        if self._backdrop is None or key != self._backdrop_key:
+            backdrop = pygame.Surface((self.width, self.height)).convert()
+            backdrop.fill((30, 30, 50))
+            overlay = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+            c = self._parse_color(self.config.overlay_color)
+            overlay.fill((c[0], c[1], c[2], self.config.overlay_alpha))
+            backdrop.blit(overlay, (0, 0))
+            self._backdrop = backdrop
+            self._backdrop_key = key
+        return self._backdrop
+    
     def _draw_main(self, screen):
         if not self.config:
             return
         panel_rect = self._get_panel_rect()
         sel = self.selected_element == ("panel", "main")
         
-        ps = pygame.Surface((panel_rect.width, panel_rect.height), pygame.SRCALPHA)
-        pygame.draw.rect(ps, self._parse_color(self.config.panel_bg_color), ps.get_rect(), border_radius=self.config.panel_border_radius)
-        bc = (255, 200, 0) if sel else self._parse_color(self.config.panel_border_color)[:3]
-        pygame.draw.rect(ps, bc, ps.get_rect(), width=self.config.panel_border_width + (2 if sel else 0), border_radius=self.config.panel_border_radius)
+        ps = self._get_box(panel_rect.size, self.config.panel_bg_color, self.config.panel_border_color,
+                           self.config.panel_border_width, self.config.panel_border_radius, sel)
         screen.blit(ps, panel_rect.topleft)
         
-        tf = self._get_font(self.config.title_size)
-        ts = tf.render(self.config.title, True, self._parse_color(self.config.title_color)[:3])
+        ts = self._render_text(self.config.title, self.config.title_size, self._parse_rgb(self.config.title_color))
         tx = panel_rect.x + int(self.config.title_x * panel_rect.width) - ts.get_width() // 2
         ty = panel_rect.y + int(self.config.title_y * panel_rect.height)
         screen.blit(ts, (tx, ty))
@@ -2836,8 +3977,8 @@ class PauseMenuPreview:
     def _draw_settings(self, screen):
         if not self.config:
             return
-        tf = self._get_font(self.config.settings_title_size)
-        ts = tf.render(self.config.settings_title, True, self._parse_color(self.config.settings_title_color)[:3])
+        ts = self._render_text(self.config.settings_title, self.config.settings_title_size,
+                               self._parse_rgb(self.config.settings_title_color))
         tx = int(self.config.settings_title_x * self.width) - ts.get_width() // 2
         ty = int(self.config.settings_title_y * self.height)
         screen.blit(ts, (tx, ty))
@@ -2851,8 +3992,7 @@ class PauseMenuPreview:
             return
         sl = self.config.save_load_screen
         title = sl.title_save if self.current_screen == "save" else sl.title_load
-        tf = self._get_font(sl.title_size)
-        ts = tf.render(title, True, self._parse_color(sl.title_color)[:3])
+        ts = self._render_text(title, sl.title_size, self._parse_rgb(sl.title_color))
         tx = int(sl.title_x * self.width) - ts.get_width() // 2
         ty = int(sl.title_y * self.height)
         screen.blit(ts, (tx, ty))
@@ -2861,16 +4001,12 @@ class PauseMenuPreview:
         for i in range(4):
             rect = self._get_slot_rect(i)
             sc = sl.slot_config
-            ss = pygame.Surface((rect.width, rect.height), pygame.SRCALPHA)
-            pygame.draw.rect(ss, self._parse_color(sc.empty_color), ss.get_rect(), border_radius=sc.border_radius)
-            bc = (255, 200, 0) if sel else self._parse_color(sc.border_color)[:3]
-            pygame.draw.rect(ss, bc, ss.get_rect(), width=sc.border_width + (2 if sel else 0), border_radius=sc.border_radius)
+            ss = self._get_box(rect.size, sc.empty_color, sc.border_color, sc.border_width, sc.border_radius, sel)
             screen.blit(ss, rect.topleft)
             
-            f = self._get_font(sc.font_size)
-            t = f.render(sc.empty_text, True, self._parse_color(sc.text_color)[:3])
+            t = self._render_text(sc.empty_text, sc.font_size, self._parse_rgb(sc.text_color))
             screen.blit(t, (rect.centerx - t.get_width() // 2, rect.centery - t.get_height() // 2))
-            sn = f.render(f"Слот {i + 1}", True, (150, 150, 180))
+            sn = self._render_text(f"Слот {i + 1}", sc.font_size, (150, 150, 180))
             screen.blit(sn, (rect.x + 10, rect.y + 10))
         
         self._draw_btn(screen, sl.back_button)
@@ -2878,28 +4014,23 @@ class PauseMenuPreview:
     def _draw_btn(self, screen, btn, panel_rect=None):
         rect = self._get_button_rect(btn, panel_rect)
         sel = self.selected_element == ("button", btn.id)
-        bs = pygame.Surface((rect.width, rect.height), pygame.SRCALPHA)
-        pygame.draw.rect(bs, self._parse_color(btn.bg_color), bs.get_rect(), border_radius=btn.border_radius)
-        bc = (255, 200, 0) if sel else self._parse_color(btn.border_color)[:3]
-        pygame.draw.rect(bs, bc, bs.get_rect(), width=btn.border_width + (2 if sel else 0), border_radius=btn.border_radius)
+        bs = self._get_box(rect.size, btn.bg_color, btn.border_color, btn.border_width, btn.border_radius, sel)
         screen.blit(bs, rect.topleft)
-        f = self._get_font(btn.font_size)
-        t = f.render(btn.text, True, self._parse_color(btn.text_color)[:3])
+        t = self._render_text(btn.text, btn.font_size, self._parse_rgb(btn.text_color))
         screen.blit(t, (rect.centerx - t.get_width() // 2, rect.centery - t.get_height() // 2))
     
     def _draw_slider(self, screen, slider):
         rect = self._get_slider_rect(slider)
         sel = self.selected_element == ("slider", slider.id)
-        lf = self._get_font(24)
-        lc = (255, 200, 0) if sel else self._parse_color(slider.label_color)[:3]
-        screen.blit(lf.render(slider.label, True, lc), (rect.x, rect.y - 30))
-        pygame.draw.rect(screen, self._parse_color(slider.track_color)[:3], rect, border_radius=5)
+        lc = (255, 200, 0) if sel else self._parse_rgb(slider.label_color)
+        screen.blit(self._render_text(slider.label, 24, lc), (rect.x, rect.y - 30))
+        pygame.draw.rect(screen, self._parse_rgb(slider.track_color), rect, border_radius=5)
         fw = int(slider.value * rect.width)
-        pygame.draw.rect(screen, self._parse_color(slider.fill_color)[:3], pygame.Rect(rect.x, rect.y, fw, rect.height), border_radius=5)
+        pygame.draw.rect(screen, self._parse_rgb(slider.fill_color), pygame.Rect(rect.x, rect.y, fw, rect.height), border_radius=5)
         if sel:
             pygame.draw.rect(screen, (255, 200, 0), rect.inflate(6, 6), 2, border_radius=7)
         hx = rect.x + fw - 10
-        pygame.draw.rect(screen, self._parse_color(slider.handle_color)[:3], pygame.Rect(hx, rect.y - 5, 20, rect.height + 10), border_radius=3)
+        pygame.draw.rect(screen, self._parse_rgb(slider.handle_color), pygame.Rect(hx, rect.y - 5, 20, rect.height + 10), border_radius=3)
     
     def refresh(self):
         self.command_queue.put(("refresh", None))